@@ -5,6 +5,9 @@ from api.constants import *
 from core.constants import *
 
 TELEGRAM_TIMEOUT = 3
+# Сколько секунд копить сообщения одного чата перед отправкой одной пачкой
+TELEGRAM_FLUSH_DELAY = 1
+BITRIX_TIMEOUT = 10
 
 
 class TelegramChatKind(str, enum.Enum):
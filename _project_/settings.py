@@ -28,6 +28,9 @@ DEBUG = env("DEBUG")
 
 ALLOWED_HOSTS = ['*']
 
+# Канонический адрес сайта для абсолютных ссылок, например в карте сайта
+SITE_URL = env('SITE_URL', default='http://localhost:8000')
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -48,11 +51,15 @@ INSTALLED_APPS = [
     'mptt',
     'accounts',
     'core',
+    'integrations.bitrix',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RobotsFaviconMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -102,6 +109,13 @@ DATABASES = {
     }
 }
 
+# Cache
+# locmem by default (tests, local development), Redis in production via CACHE_URL
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -136,13 +150,22 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
-STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
 
 # Media files
 
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = 'media/'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Manifest storage that also writes .gz/.br siblings at collectstatic time
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -191,7 +214,11 @@ CELERY_WORKER_HIJACK_ROOT_LOGGER = False
 CELERY_BEAT_SCHEDULE = {
     'publish_articles': {
         'task': 'core.tasks.publish_scheduled_articles',
-        'schedule': crontab(hour=1),
+        'schedule': crontab(),
+    },
+    'flush_bitrix_leads': {
+        'task': 'integrations.bitrix.tasks.flush_pending_leads',
+        'schedule': 10.0,
     },
 }
 
@@ -1,5 +1,3 @@
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
@@ -28,4 +26,4 @@ urlpatterns = [
     path('doc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 
     path("__debug__/", include("debug_toolbar.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
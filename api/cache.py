@@ -0,0 +1,78 @@
+"""
+Кэш отрендеренной структуры опросов
+
+Для каждого опроса хранится список (id, order, json) вопросов в порядке следования.
+Ключ содержит версию структуры, которую сигналы Question и AnswerOption меняют при правках,
+поэтому старые записи просто перестают читаться и вытесняются по таймауту.
+"""
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from core import cache as versioned_cache, models
+from core.signals import survey_structure_version_name
+
+from . import constants, serializers
+
+_STATS_KEY = "survey:structure:stats:{name}"
+STATS_NAMES = ("hit", "miss")
+
+
+def _count(name) -> None:
+    """Счётчик в общем кэше, чтобы видеть попадания всех процессов gunicorn и celery"""
+    key = _STATS_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats() -> dict:
+    """
+    :rtype: dict
+    :return: Попадания и промахи кэша структуры опросов по всем процессам
+    """
+    found = cache.get_many([_STATS_KEY.format(name=name) for name in STATS_NAMES])
+    return {name: found.get(_STATS_KEY.format(name=name), 0) for name in STATS_NAMES}
+
+
+def _structure_key(survey_id) -> str:
+    version = versioned_cache.get_version(survey_structure_version_name(survey_id))
+    return f"survey:{survey_id}:structure:v{version}"
+
+
+def get_survey_structure(survey_id) -> list:
+    """
+    :rtype: list
+    :return: Список (id, order, json) вопросов опроса по порядку
+    """
+    key = _structure_key(survey_id)
+    structure = cache.get(key)
+    if structure is not None:
+        _count("hit")
+        return structure
+
+    _count("miss")
+    renderer = JSONRenderer()
+    questions = models.Question.objects.filter(survey_id=survey_id).prefetch_related('options').order_by('order')
+    structure = [
+        (question.id, question.order, renderer.render(serializers.QuestionSerializer(question).data))
+        for question in questions
+    ]
+    cache.set(key, structure, timeout=constants.SURVEY_STRUCTURE_CACHE_TIMEOUT)
+    return structure
+
+
+def get_next_question_json(survey_id, after_order=None):
+    """JSON первого вопроса с порядком больше after_order, None если вопросов не осталось"""
+    for _, order, content in get_survey_structure(survey_id):
+        if after_order is None or order > after_order:
+            return content
+    return None
+
+
+def get_question_json(survey_id, question_id):
+    for pk, _, content in get_survey_structure(survey_id):
+        if pk == question_id:
+            return content
+    return None
@@ -0,0 +1,3 @@
+SURVEY_STRUCTURE_CACHE_TIMEOUT = 60 * 60 * 24
+
+__all__ = ["SURVEY_STRUCTURE_CACHE_TIMEOUT"]
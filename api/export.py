@@ -0,0 +1,47 @@
+"""Потоковая выгрузка ответов на опрос без загрузки всех строк в память"""
+import csv
+import json
+
+from core import models
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = ('user', 'question_order', 'question_text', 'option_text', 'answered_at')
+
+
+class _Echo:
+    """Псевдо-файл для csv.writer, возвращающий записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def iter_survey_answers(survey_id):
+    """Кортежи (user, question order, question text, option text, answered_at) по частям из курсора БД"""
+    return (
+        models.UserAnswer.objects
+        .filter(question__survey_id=survey_id)
+        .order_by('user_survey_id', 'question__order')
+        .values_list(
+            'user_survey__user__username',
+            'question__order',
+            'question__text',
+            'selected_option__text',
+            'answered_at',
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for user, order, question_text, option_text, answered_at in rows:
+        yield writer.writerow((user, order, question_text, option_text, answered_at.isoformat()))
+
+
+def stream_ndjson(rows):
+    for user, order, question_text, option_text, answered_at in rows:
+        yield json.dumps(
+            dict(zip(EXPORT_COLUMNS, (user, order, question_text, option_text, answered_at.isoformat()))),
+            ensure_ascii=False
+        ) + '\n'
@@ -0,0 +1,73 @@
+import binascii
+import datetime
+from base64 import b64decode, b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class SurveyCursorPagination(CursorPagination):
+    """Постраничный вывод опросов по индексу created_at, глубина страницы не влияет на скорость"""
+    ordering = '-created_at'
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+
+    @classmethod
+    def is_requested(cls, request):
+        """Клиент выбрал курсорный режим, ссылки next/previous сохраняют оба параметра"""
+        return (
+            request.query_params.get(cls.mode_query_param) == 'cursor'
+            or cls.cursor_query_param in request.query_params
+        )
+
+
+class ArticleKeysetPagination(BasePagination):
+    """
+    Keyset-пагинация ленты статей по (publish_at, id) от новых к старым
+    Курсор хранит ключ последней статьи страницы, OFFSET не используется
+    """
+    page_size = 20
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор'
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            publish_at, pk = b64decode(encoded.encode('ascii'), altchars=b'-_').decode('ascii').split('|')
+            return datetime.datetime.fromisoformat(publish_at), int(pk)
+        except (TypeError, ValueError, binascii.Error, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, article):
+        raw = f'{article.publish_at.isoformat()}|{article.pk}'
+        return b64encode(raw.encode('ascii'), altchars=b'-_').decode('ascii')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            publish_at, pk = cursor
+            queryset = queryset.filter(Q(publish_at__lt=publish_at) | Q(publish_at=publish_at, id__lt=pk))
+
+        results = list(queryset.order_by('-publish_at', '-id')[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
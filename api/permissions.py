@@ -8,3 +8,12 @@ class IsAdminUser(permissions.BasePermission):
 
     def has_permission(self, request, view):
         return bool(request.user and request.user.is_staff)
+
+
+class IsAuthorOrAdminUser(permissions.BasePermission):
+    """
+    Разрешение на объект только его автору или администратору.
+    """
+
+    def has_object_permission(self, request, view, obj):
+        return bool(request.user and (request.user.is_staff or obj.author_id == request.user.id))
@@ -1,3 +1,4 @@
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django.contrib.redirects.models import Redirect
 from rest_framework import serializers
@@ -26,6 +27,34 @@ class FeedbackRequestSerializer(serializers.ModelSerializer):
         fields = ("first_name", "phone", "comment")
 
 
+class ArticleListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Article
+        fields = ("name", "slug", "image", "publish_at", "seo_title", "seo_description")
+
+
+class ArticleSerializer(serializers.ModelSerializer):
+    next_article = serializers.SerializerMethodField()
+    previous_article = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Article
+        fields = ("name", "slug", "image", "publish_at", "content", "table_of_contents",
+                  "og_title", "og_description", "og_type", "og_type_pb_time", "og_type_author",
+                  "seo_h1", "seo_title", "seo_description", "seo_keywords",
+                  "next_article", "previous_article")
+
+    @staticmethod
+    def _neighbour(slug, name):
+        return {"slug": slug, "name": name} if slug else None
+
+    def get_next_article(self, obj):
+        return self._neighbour(obj.next_slug, obj.next_name)
+
+    def get_previous_article(self, obj):
+        return self._neighbour(obj.previous_slug, obj.previous_name)
+
+
 class AnswerOptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.AnswerOption
@@ -43,12 +72,14 @@ class QuestionSerializer(serializers.ModelSerializer):
         # Извлекаем вложенные данные (варианты ответов)
         options_data = validated_data.pop('options', [])
 
-        # Создаём вопрос
-        question = models.Question.objects.create(**validated_data)
+        with transaction.atomic():
+            # Создаём вопрос
+            question = models.Question.objects.create(**validated_data)
 
-        # Создаём варианты ответов, если они есть
-        for option_data in options_data:
-            models.AnswerOption.objects.create(question=question, **option_data)
+            # Создаём варианты ответов одним запросом
+            models.AnswerOption.objects.bulk_create(
+                models.AnswerOption(question=question, **option_data) for option_data in options_data
+            )
 
         return question
 
@@ -73,39 +104,232 @@ class SurveySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class SurveyImportOptionSerializer(AnswerOptionSerializer):
+
+    class Meta(AnswerOptionSerializer.Meta):
+        # Без порядка нельзя проверить повторы, а значение по умолчанию у всех одинаковое
+        extra_kwargs = {'order': {'required': True}}
+
+
+class SurveyImportQuestionSerializer(serializers.ModelSerializer):
+    options = SurveyImportOptionSerializer(many=True)
+
+    class Meta:
+        model = models.Question
+        fields = ['id', 'text', 'order', 'options']
+        extra_kwargs = {'order': {'required': True}}
+
+    def validate_options(self, value):
+        orders = [option['order'] for option in value]
+        if len(orders) != len(set(orders)):
+            raise serializers.ValidationError("Порядковые номера вариантов ответа повторяются.")
+        return value
+
+
+class SurveyImportSerializer(serializers.ModelSerializer):
+    """Создание опроса вместе со всеми вопросами и вариантами ответов"""
+    author = serializers.StringRelatedField(read_only=True)
+    questions = SurveyImportQuestionSerializer(many=True)
+
+    class Meta:
+        model = models.Survey
+        fields = ['id', 'title', 'author', 'created_at', 'questions']
+        read_only_fields = ['author']
+
+    def validate_questions(self, value):
+        orders = [question['order'] for question in value]
+        if len(orders) != len(set(orders)):
+            raise serializers.ValidationError("Порядковые номера вопросов повторяются.")
+        return value
+
+    def create(self, validated_data):
+        questions_data = validated_data.pop('questions')
+        validated_data['author'] = self.context['request'].user
+
+        # Число запросов не зависит от размера опроса: опрос, вопросы, варианты
+        with transaction.atomic():
+            survey = models.Survey.objects.create(**validated_data)
+            questions = models.Question.objects.bulk_create([
+                models.Question(survey=survey, text=question_data['text'], order=question_data['order'])
+                for question_data in questions_data
+            ])
+            models.AnswerOption.objects.bulk_create([
+                models.AnswerOption(question=question, **option_data)
+                for question, question_data in zip(questions, questions_data)
+                for option_data in question_data['options']
+            ])
+
+        return survey
+
+
+class SurveyFullSerializer(SurveySerializer):
+    """Опрос вместе со всеми вопросами и вариантами ответов"""
+    questions = SurveyImportQuestionSerializer(many=True, read_only=True)
+
+
 class UserAnswerSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.UserAnswer
         fields = ['id', 'question', 'selected_option']
 
     def validate(self, attrs):
-        """Проверяем, что пользователь не ответил на этот вопрос ранее в рамках опроса"""
+        """
+        Получаем прохождение опроса пользователем
+        Повторный ответ на вопрос отсекается уникальным ограничением при вставке
+        """
         user = self.context['request'].user
         question = attrs['question']
-        survey = question.survey
 
         # Получаем или создаём UserSurvey
-        user_survey, _ = models.UserSurvey.objects.get_or_create(user=user, survey=survey)
-
-        # Проверяем, есть ли уже ответ на этот вопрос
-        if models.UserAnswer.objects.filter(user_survey=user_survey, question=question).exists():
-            raise serializers.ValidationError("Вы уже ответили на этот вопрос.")
+        user_survey, _ = models.UserSurvey.objects.get_or_create(user=user, survey_id=question.survey_id)
 
         attrs['user_survey'] = user_survey
         return attrs
 
     def create(self, validated_data):
         user_survey = validated_data.pop('user_survey')
+        question = validated_data['question']
+
+        with transaction.atomic():
+            # Блокируем прохождение, чтобы параллельные ответы не сбили курсор
+            user_survey = models.UserSurvey.objects.select_for_update().get(pk=user_survey.pk)
+
+            # Вопросы проходятся строго по порядку, иначе курсор прогресса пропустит неотвеченные
+            pending = user_survey.get_pending_questions()
+            answered_question_ids = {question_id for question_id, _, answered in pending if answered}
+            if question.id in answered_question_ids or (
+                user_survey.last_answered_order is not None and question.order <= user_survey.last_answered_order
+            ):
+                raise serializers.ValidationError("Вы уже ответили на этот вопрос.")
+            if question.id not in user_survey.get_expected_question_ids(pending):
+                raise serializers.ValidationError("Сначала нужно ответить на предыдущие вопросы.")
+
+            # Создаём ответ, дубликат отсекает ограничение (user_survey, question)
+            try:
+                user_answer = models.UserAnswer.objects.create(user_survey=user_survey, **validated_data)
+            except IntegrityError:
+                raise serializers.ValidationError("Вы уже ответили на этот вопрос.")
+
+            # Сдвигаем курсор и проверяем, остались ли непройденные вопросы
+            update_fields = ['last_answered_order', 'answered_count']
+            # Завершение фиксируется один раз, ответы на вопросы, добавленные позже, его не повторяют
+            finished_now = user_survey.register_answers(pending, {question.id}) and user_survey.finished_at is None
+            if finished_now:
+                user_survey.finished_at = timezone.now()
+                update_fields.append('finished_at')
+            user_survey.save(update_fields=update_fields)
+
+            # Обновляем агрегаты статистики в той же транзакции
+            models.AnswerOptionStatistics.increment({'option_id': user_answer.selected_option_id}, votes=1)
+            if finished_now:
+                models.SurveyStatistics.increment(
+                    {'survey_id': user_survey.survey_id},
+                    finished_count=1,
+                    duration_sum=user_survey.finished_at - user_survey.started_at,
+                )
+
+        return user_answer
+
+
+class UserAnswerBulkItemSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    selected_option = serializers.IntegerField()
+
+
+class UserAnswerBulkSerializer(serializers.Serializer):
+    """Пакетная отправка ответов на несколько вопросов одного опроса"""
+    answers = UserAnswerBulkItemSerializer(many=True, allow_empty=False)
 
-        # Создаём ответ
-        user_answer = models.UserAnswer.objects.create(user_survey=user_survey, **validated_data)
-
-        # Проверяем, остались ли непройденные вопросы
-        answered_question_ids = user_survey.answers.values_list('question_id', flat=True)
-        remaining_questions = user_survey.survey.questions.exclude(id__in=answered_question_ids)
+    def validate(self, attrs):
+        user = self.context['request'].user
+        items = attrs['answers']
+
+        # Одним запросом достаём все вопросы вместе с вариантами ответов
+        questions = {
+            question.id: question
+            for question in models.Question.objects.filter(
+                id__in={item['question'] for item in items}
+            ).prefetch_related('options')
+        }
+        survey_id = next(
+            (questions[item['question']].survey_id for item in items if item['question'] in questions),
+            None
+        )
+        if survey_id is None:
+            raise serializers.ValidationError({'answers': [{'question': ['Вопрос не найден.']} for _ in items]})
+
+        user_survey, _ = models.UserSurvey.objects.get_or_create(user=user, survey_id=survey_id)
+        pending = user_survey.get_pending_questions()
+        answered_question_ids = {question_id for question_id, _, answered in pending if answered}
+        # Пакет должен закрывать ровно следующие по порядку неотвеченные вопросы
+        expected_question_ids = set(user_survey.get_expected_question_ids(pending, len(items)))
+
+        errors = []
+        for item in items:
+            question = questions.get(item['question'])
+            item_errors = {}
+            if question is None:
+                item_errors['question'] = ['Вопрос не найден.']
+            elif question.survey_id != survey_id:
+                item_errors['question'] = ['Вопрос относится к другому опросу.']
+            elif question.id in answered_question_ids or (
+                user_survey.last_answered_order is not None and question.order <= user_survey.last_answered_order
+            ):
+                item_errors['question'] = ['Вы уже ответили на этот вопрос.']
+            elif question.id not in expected_question_ids:
+                item_errors['question'] = ['Сначала нужно ответить на предыдущие вопросы.']
+            elif item['selected_option'] not in {option.id for option in question.options.all()}:
+                item_errors['selected_option'] = ['Вариант ответа не относится к вопросу.']
+
+            if question is not None:
+                answered_question_ids.add(question.id)
+            errors.append(item_errors)
+
+        if any(errors):
+            raise serializers.ValidationError({'answers': errors})
 
-        if not remaining_questions.exists():
-            user_survey.finished_at = timezone.now()
-            user_survey.save()
+        attrs['user_survey'] = user_survey
+        return attrs
 
-        return user_answer
\ No newline at end of file
+    def create(self, validated_data):
+        items = validated_data['answers']
+
+        with transaction.atomic():
+            user_survey = models.UserSurvey.objects.select_for_update().get(pk=validated_data['user_survey'].pk)
+
+            # Курсор мог сдвинуться параллельным ответом после валидации
+            pending = user_survey.get_pending_questions()
+            question_ids = {item['question'] for item in items}
+            if not question_ids <= set(user_survey.get_expected_question_ids(pending, len(items))):
+                raise serializers.ValidationError("Сначала нужно ответить на предыдущие вопросы.")
+
+            try:
+                user_answers = models.UserAnswer.objects.bulk_create([
+                    models.UserAnswer(
+                        user_survey=user_survey,
+                        question_id=item['question'],
+                        selected_option_id=item['selected_option'],
+                    )
+                    for item in items
+                ])
+            except IntegrityError:
+                raise serializers.ValidationError("Вы уже ответили на один из вопросов.")
+
+            # Курсор и завершение опроса считаем один раз на весь пакет
+            update_fields = ['last_answered_order', 'answered_count']
+            # Завершение фиксируется один раз, ответы на вопросы, добавленные позже, его не повторяют
+            finished_now = user_survey.register_answers(pending, question_ids) and user_survey.finished_at is None
+            if finished_now:
+                user_survey.finished_at = timezone.now()
+                update_fields.append('finished_at')
+            user_survey.save(update_fields=update_fields)
+
+            models.AnswerOptionStatistics.increment_many('option_id', [item['selected_option'] for item in items], votes=1)
+            if finished_now:
+                models.SurveyStatistics.increment(
+                    {'survey_id': user_survey.survey_id},
+                    finished_count=1,
+                    duration_sum=user_survey.finished_at - user_survey.started_at,
+                )
+
+        return user_answers
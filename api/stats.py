@@ -0,0 +1,104 @@
+"""
+Статистика опроса одним SQL-запросом
+
+Голоса берутся из агрегатов AnswerOptionStatistics, доли и лучший вариант считаются
+оконными функциями по вопросу, а время прохождения подставляется скалярными подзапросами,
+которые PostgreSQL выполняет один раз на весь запрос.
+"""
+from django.db.models import (
+    Aggregate, DurationField, ExpressionWrapper, F, Subquery, Sum, Value, Window,
+)
+from django.db.models.functions import Coalesce, RowNumber
+
+from core import models
+
+
+class PercentileCont(Aggregate):
+    """percentile_cont(p) WITHIN GROUP (ORDER BY expression), только PostgreSQL"""
+    function = 'PERCENTILE_CONT'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+def _seconds(value):
+    return value.total_seconds() if value is not None else None
+
+
+def get_survey_statistics(survey_id) -> dict:
+    """
+    :rtype: dict
+    :return: Ответы по вопросам, голоса и доли вариантов, лучший вариант вопроса,
+        среднее и перцентили времени прохождения в секундах
+    """
+    votes = Coalesce(F('statistics__votes'), Value(0))
+    duration = ExpressionWrapper(F('finished_at') - F('started_at'), output_field=DurationField())
+    finished = models.UserSurvey.objects.filter(
+        survey_id=survey_id, finished_at__isnull=False
+    ).order_by().values('survey_id')
+    survey_stats = models.SurveyStatistics.objects.filter(survey_id=survey_id)
+
+    rows = (
+        models.AnswerOption.objects
+        .filter(question__survey_id=survey_id)
+        .annotate(
+            votes=votes,
+            question_total=Window(Sum(votes), partition_by=F('question_id')),
+            vote_rank=Window(RowNumber(), partition_by=F('question_id'), order_by=[votes.desc(), F('order').asc()]),
+            p50=Subquery(
+                finished.annotate(value=PercentileCont(duration, 0.5, output_field=DurationField())).values('value')
+            ),
+            p90=Subquery(
+                finished.annotate(value=PercentileCont(duration, 0.9, output_field=DurationField())).values('value')
+            ),
+            finished_count=Subquery(survey_stats.values('finished_count')),
+            duration_sum=Subquery(survey_stats.values('duration_sum')),
+        )
+        .values(
+            'id', 'text', 'question_id', 'question__text', 'votes', 'question_total', 'vote_rank',
+            'p50', 'p90', 'finished_count', 'duration_sum',
+        )
+        .order_by('question_id', 'vote_rank')
+    )
+
+    answers_count = []
+    popular_answers = []
+    top_answers = []
+    completion = {}
+    for row in rows:
+        completion = row
+        if not row['votes']:
+            continue
+
+        if row['vote_rank'] == 1:
+            answers_count.append({
+                'question__id': row['question_id'],
+                'question__text': row['question__text'],
+                'total_answers': row['question_total'],
+            })
+        answer = {
+            'question__id': row['question_id'],
+            'selected_option__id': row['id'],
+            'selected_option__text': row['text'],
+            'votes': row['votes'],
+            'question_total': row['question_total'],
+            'share': row['votes'] / row['question_total'],
+        }
+        popular_answers.append(answer)
+        if row['vote_rank'] == 1:
+            top_answers.append(answer)
+
+    finished_count = completion.get('finished_count')
+    avg_duration = completion['duration_sum'] / finished_count if finished_count else None
+
+    return {
+        'answers_count': answers_count,
+        'popular_answers': popular_answers,
+        'top_answers': top_answers,
+        'avg_completion_time': _seconds(avg_duration),
+        'completion_time_percentiles': {
+            'p50': _seconds(completion.get('p50')),
+            'p90': _seconds(completion.get('p90')),
+        },
+    }
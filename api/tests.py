@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import models
+
+
+class SurveyImportTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='author', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def _payload(questions_count, options_count):
+        return {
+            'title': f'Опрос на {questions_count} вопросов',
+            'questions': [
+                {
+                    'text': f'Вопрос {i}',
+                    'order': i,
+                    'options': [{'text': f'Вариант {j}', 'order': j} for j in range(options_count)],
+                }
+                for i in range(questions_count)
+            ],
+        }
+
+    def test_import_query_count_does_not_depend_on_size(self):
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post('/api/survey/import/', self._payload(2, 2), format='json')
+        self.assertEqual(response.status_code, 201)
+
+        with self.assertNumQueries(len(small)):
+            response = self.client.post('/api/survey/import/', self._payload(30, 5), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['questions']), 30)
+
+    def test_import_without_order_is_rejected(self):
+        payload = self._payload(1, 1)
+        del payload['questions'][0]['order']
+        del payload['questions'][0]['options'][0]['order']
+
+        response = self.client.post('/api/survey/import/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('order', response.data['questions'][0])
+        self.assertIn('order', response.data['questions'][0]['options'][0])
+
+
+class SurveyListTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='reader', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_surveys(self, count):
+        User = get_user_model()
+        for i in range(count):
+            author = User.objects.create_user(username=f'author-{models.Survey.objects.count()}', password='password')
+            models.Survey.objects.create(title=f'Опрос {i}', author=author)
+
+    def test_list_query_count_does_not_depend_on_authors(self):
+        self._create_surveys(2)
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.get('/api/survey/')
+        self.assertEqual(response.status_code, 200)
+
+        self._create_surveys(20)
+        with self.assertNumQueries(len(small)):
+            response = self.client.get('/api/survey/')
+        self.assertEqual(response.data['count'], 22)
+
+    def test_cursor_pagination_is_opt_in(self):
+        self._create_surveys(3)
+
+        response = self.client.get('/api/survey/')
+        self.assertIn('count', response.data)
+
+        response = self.client.get('/api/survey/', {'pagination': 'cursor', 'limit': 2})
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
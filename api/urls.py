@@ -4,6 +4,7 @@ from rest_framework import routers
 from . import views
 
 router = routers.DefaultRouter()
+router.register(r'article', views.ArticleView, basename='article')
 router.register(r'survey', views.SurveyView, basename='survey')
 router.register(r'question', views.QuestionView, basename='question')
 router.register(r'user-answer', views.UserAnswerView, basename='user-answer')
@@ -3,10 +3,12 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework.decorators import action
-from django.db.models import Count, Avg, F, ExpressionWrapper, DurationField
+from rest_framework.generics import get_object_or_404
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 
-
-from . import serializers
+from . import serializers, pagination, renderers, export, stats, cache as survey_cache
+from . import permissions as api_permissions
 
 from core import models
 
@@ -16,6 +18,27 @@ class FeedbackRequestCreateView(generics.CreateAPIView):
     permission_classes = (AllowAny,)
 
 
+class ArticleView(
+    viewsets.GenericViewSet,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+):
+    permission_classes = (AllowAny,)
+    serializer_class = serializers.ArticleSerializer
+    pagination_class = pagination.ArticleKeysetPagination
+    lookup_field = 'slug'
+
+    def get_queryset(self):
+        if self.action == 'retrieve':
+            return models.Article.objects.get_published_with_neighbours()
+        return models.Article.objects.get_published().defer('content', 'table_of_contents')
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return serializers.ArticleListSerializer
+        return self.serializer_class
+
+
 class SurveyView(
     viewsets.GenericViewSet,
     mixins.UpdateModelMixin,
@@ -24,10 +47,40 @@ class SurveyView(
     mixins.RetrieveModelMixin,
 ):
     permission_classes = [permissions.IsAuthenticated]
-    queryset = models.Survey.objects.all()
+    queryset = models.Survey.objects.select_related('author')
     serializer_class = serializers.SurveySerializer
     http_method_names = ['get', 'post', 'patch']
 
+    @property
+    def paginator(self):
+        # Курсорная пагинация включается явно через ?pagination=cursor, по умолчанию LimitOffsetPagination
+        if not hasattr(self, '_paginator'):
+            if self.request is not None and pagination.SurveyCursorPagination.is_requested(self.request):
+                self._paginator = pagination.SurveyCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def _expand_questions(self):
+        return self.action == 'retrieve' and self.request.query_params.get('expand') == 'questions'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self._expand_questions():
+            # Всё дерево опроса за три запроса: опрос с автором, вопросы, варианты
+            queryset = queryset.select_related('author').prefetch_related(
+                Prefetch('questions', queryset=models.Question.objects.order_by('order')),
+                'questions__options',
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'import_survey':
+            return serializers.SurveyImportSerializer
+        if self._expand_questions():
+            return serializers.SurveyFullSerializer
+        return self.serializer_class
+
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -37,6 +90,34 @@ class SurveyView(
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_survey(self, request, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        survey = serializer.save()
+
+        # Перечитываем дерево опроса фиксированным числом запросов
+        survey = models.Survey.objects.select_related('author').prefetch_related('questions__options').get(pk=survey.pk)
+        return Response(self.get_serializer(survey).data, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path='export',
+        renderer_classes=[renderers.CSVRenderer, renderers.NDJSONRenderer],
+        permission_classes=[permissions.IsAuthenticated, api_permissions.IsAuthorOrAdminUser],
+    )
+    def export(self, request, **kwargs):
+        survey = self.get_object()
+        renderer = request.accepted_renderer
+
+        rows = export.iter_survey_answers(survey.id)
+        stream = export.stream_ndjson(rows) if renderer.format == 'ndjson' else export.stream_csv(rows)
+
+        response = StreamingHttpResponse(stream, content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['Content-Disposition'] = f'attachment; filename="survey-{survey.id}.{renderer.format}"'
+        return response
+
 
 class QuestionView(
     viewsets.GenericViewSet,
@@ -57,9 +138,21 @@ class QuestionView(
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
+    def retrieve(self, request, *args, **kwargs):
+        survey_id = get_object_or_404(self.get_queryset().values_list('survey_id', flat=True), pk=kwargs['pk'])
+        content = survey_cache.get_question_json(survey_id, int(kwargs['pk']))
+        if content is None:
+            raise Http404()
+        return HttpResponse(content, content_type='application/json')
+
     def partial_update(self, request, *args, **kwargs):
         return super().partial_update(request, *args, **kwargs)
 
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[permissions.IsAdminUser])
+    def cache_stats(self, request, **kwargs):
+        """Попадания и промахи кэша структуры опросов"""
+        return Response(survey_cache.get_stats())
+
     @action(detail=False, methods=['get'], url_path='next-question')
     def get_next_question(self, request, **kwargs):
         survey_id = request.query_params.get('survey_id')
@@ -74,23 +167,14 @@ class QuestionView(
         # Получаем или создаём запись о прохождении
         user_survey, _ = models.UserSurvey.objects.get_or_create(user=request.user, survey=survey)
 
-        # Определяем, какие вопросы уже пройдены
-        answered_question_ids = user_survey.answers.values_list('question_id', flat=True)
-
-        # Ищем первый ещё неотвеченный вопрос по порядку
-        next_question = (
-            survey.questions
-            .exclude(id__in=answered_question_ids)
-            .order_by('order')
-            .first()
-        )
+        # Ищем первый вопрос после курсора прогресса в закэшированной структуре опроса
+        content = survey_cache.get_next_question_json(survey.id, user_survey.last_answered_order)
 
-        if not next_question:
+        if content is None:
             return Response({'detail': 'Опрос завершён'}, status=status.HTTP_200_OK)
 
         # Возвращаем сам вопрос и варианты ответов
-        serializer = self.get_serializer(next_question)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return HttpResponse(content, content_type='application/json')
 
 
 class UserAnswerView(
@@ -101,12 +185,27 @@ class UserAnswerView(
     queryset = models.UserAnswer.objects.all()
     serializer_class = serializers.UserAnswerSerializer
 
+    def get_serializer_class(self):
+        if self.action == 'bulk':
+            return serializers.UserAnswerBulkSerializer
+        return self.serializer_class
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_answers = serializer.save()
+        return Response(
+            serializers.UserAnswerSerializer(user_answers, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
     @action(detail=False, methods=['get'], url_path='survey-statistics')
     def survey_statistics(self, request, **kwargs):
         survey_id = request.query_params.get('survey_id')
@@ -118,28 +217,5 @@ class UserAnswerView(
         except models.Survey.DoesNotExist:
             return Response({"error": "Опрос не найден"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Подсчёт количества ответов на каждый вопрос
-        answers_count = models.UserAnswer.objects.filter(
-            question__survey=survey
-        ).values('question__id', 'question__text').annotate(
-            total_answers=Count('id')
-        )
-
-        # Популярные ответы для каждого вопроса
-        popular_answers = models.UserAnswer.objects.filter(
-            question__survey=survey
-        ).values('question__id', 'selected_option__id', 'selected_option__text').annotate(
-            votes=Count('id')
-        ).order_by('question__id', '-votes')
-
-        # Среднее время прохождения опроса
-        user_surveys = models.UserSurvey.objects.filter(survey=survey, finished_at__isnull=False).annotate(
-            duration=ExpressionWrapper(F('finished_at') - F('started_at'), output_field=DurationField())
-        )
-        avg_duration = user_surveys.aggregate(avg_time=Avg('duration'))['avg_time']
-
-        return Response({
-            "answers_count": list(answers_count),
-            "popular_answers": list(popular_answers),
-            "avg_completion_time": avg_duration.total_seconds() if avg_duration else None
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        # Голоса, доли, лучшие варианты и время прохождения одним запросом
+        return Response(stats.get_survey_statistics(survey.id), status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,45 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+_VERSION_KEY = "version:{name}"
+
+
+def get_version(name: str) -> int:
+    """
+    Текущая версия именованного набора данных в общем кэше
+
+    Если ключ версии вытеснен из кэша, создаётся новая версия на основе времени,
+    чтобы не переиспользовать записи, сохранённые под старыми версиями
+    """
+    key = _VERSION_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(*names: str) -> tuple:
+    """Версии нескольких наборов данных за один запрос к кэшу"""
+    keys = [_VERSION_KEY.format(name=name) for name in names]
+    found = cache.get_many(keys)
+    return tuple(
+        found[key] if key in found else get_version(name)
+        for name, key in zip(names, keys)
+    )
+
+
+def bump_version(name: str) -> None:
+    """Инвалидирует все записи, сохранённые под текущей версией"""
+    key = _VERSION_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_version_on_commit(name: str) -> None:
+    """Меняет версию после коммита, чтобы другие процессы не закэшировали старые данные"""
+    transaction.on_commit(lambda: bump_version(name))
@@ -2,7 +2,7 @@ import logging
 
 from django.utils.functional import SimpleLazyObject
 
-from . import models
+from . import models, site_chrome
 
 logger = logging.getLogger(__name__)
 
@@ -21,24 +21,27 @@ def site_settings(request):
     }
 
 
+def _get_site_chrome(request):
+    # Один раз на запрос, даже если процессоров несколько
+    if not hasattr(request, "_site_chrome"):
+        request._site_chrome = site_chrome.get_site_chrome()
+    return request._site_chrome
+
+
 def company_contacts(request):
     return {
-        "contacts": models.CompanyContacts.objects.first()
+        "contacts": _get_site_chrome(request)["contacts"]
     }
 
 
 def extra_fields(request):
     return {
-        "extra_fields": {
-            f.key: f for f in models.ExtraFields.objects.all()
-        }
+        "extra_fields": _get_site_chrome(request)["extra_fields"]
     }
 
 
 def text_pages(request):
-    pages = models.TextPage.objects.order_by("menu_position", "pk")
+    # Меню считается только если шаблон к нему обратится
     return {
-        "text_pages": {
-            p.slug: p for p in pages
-        }
+        "text_pages": SimpleLazyObject(site_chrome.get_menu)
     }
@@ -0,0 +1,10 @@
+def accepted_encodings(request) -> set:
+    """Кодировки из Accept-Encoding, кроме явно запрещённых через q=0"""
+    encodings = set()
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            encodings.add(name.lower())
+    return encodings
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core import models
+
+
+class Command(BaseCommand):
+    help = 'Рассчитывает оглавление и якоря заголовков для существующих статей'
+
+    def handle(self, *args, **options):
+        count = 0
+        for article in models.Article.objects.only('id', 'content', 'is_published', 'publish_at').iterator():
+            article.save(update_fields=['content'])
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Оглавление обновлено у статей: {count}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.statistics import rebuild_survey_statistics
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает агрегаты статистики опросов по сохранённым ответам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey', type=int, help='id опроса, по умолчанию пересчитываются все')
+
+    def handle(self, *args, **options):
+        rebuild_survey_statistics(options['survey'])
+        self.stdout.write(self.style.SUCCESS('Статистика пересчитана'))
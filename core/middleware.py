@@ -1,4 +1,17 @@
-from . import constants
+import hashlib
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.views.static import was_modified_since
+
+from . import cache as versioned_cache, constants, http, models
 
 
 class UTMSaveMiddleware:
@@ -19,3 +32,145 @@ class UTMSaveMiddleware:
 
         response = self.get_response(request)
         return response
+
+
+class StaticFilesMiddleware:
+    """
+    Отдаёт static и media, не доходя до сессий, авторизации и view
+
+    Для static выбирается заранее сжатая копия (.br или .gz) по Accept-Encoding,
+    файлы с хэшем в имени из манифеста кэшируются браузером навсегда.
+    FileResponse отдаёт файл через wsgi.file_wrapper, т.е. sendfile у gunicorn.
+    Ставится сразу после SecurityMiddleware, чтобы файлы получали её заголовки
+    """
+
+    hashed_max_age = 60 * 60 * 24 * 365
+    default_max_age = 60 * 60
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.roots = [
+            (self._url_prefix(settings.STATIC_URL), settings.STATIC_ROOT, True),
+            (self._url_prefix(settings.MEDIA_URL), settings.MEDIA_ROOT, False),
+        ]
+        self._hashed_names = None
+
+    @staticmethod
+    def _url_prefix(url):
+        return "/" + url.strip("/") + "/"
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD"):
+            for prefix, root, is_static in self.roots:
+                if request.path.startswith(prefix):
+                    response = self._serve(request, request.path[len(prefix):], root, is_static)
+                    if response is not None:
+                        return response
+                    break
+
+        return self.get_response(request)
+
+    def _serve(self, request, name, root, is_static):
+        try:
+            # request.path уже декодирован Django
+            path = safe_join(root, name)
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime):
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(path)
+            encoding, serve_path = None, path
+            if is_static:
+                accepted = http.accepted_encodings(request)
+                for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+                    if candidate in accepted and os.path.isfile(path + suffix):
+                        encoding, serve_path = candidate, path + suffix
+                        break
+
+            response = FileResponse(
+                open(serve_path, "rb"),
+                content_type=content_type or "application/octet-stream",
+            )
+            # FileResponse берёт имя из открытого файла, для ассетов заголовок не нужен
+            del response["Content-Disposition"]
+            if encoding:
+                response["Content-Encoding"] = encoding
+            if is_static:
+                patch_vary_headers(response, ("Accept-Encoding",))
+            response["Last-Modified"] = http_date(stat.st_mtime)
+
+        if is_static and self._is_hashed(name):
+            response["Cache-Control"] = f"public, max-age={self.hashed_max_age}, immutable"
+        else:
+            response["Cache-Control"] = f"public, max-age={self.default_max_age}"
+        return response
+
+    def _is_hashed(self, name):
+        # Манифест загружается при старте процесса и дальше не меняется
+        if self._hashed_names is None:
+            self._hashed_names = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        return name in self._hashed_names
+
+
+class RobotsFaviconMiddleware:
+    """
+    Отдаёт robots.txt и favicon из SiteSettings в обход сессий, авторизации и редиректов
+    Тело и ETag собираются один раз на версию настроек, на запрос приходится один GET версии из кэша
+    Ставится в начало MIDDLEWARE
+    """
+
+    paths = {"/robots.txt": "robots", "/favicon.ico": "favicon"}
+    max_age = {"robots": 60 * 60, "favicon": 60 * 60 * 24}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._cached = (None, {})
+
+    def __call__(self, request):
+        kind = self.paths.get(request.path)
+        if kind is None or request.method not in ("GET", "HEAD"):
+            return self.get_response(request)
+
+        resource = self._get_resources().get(kind)
+        if resource is None:
+            return self.get_response(request)
+
+        content, content_type, etag = resource
+        if etag in request.META.get("HTTP_IF_NONE_MATCH", ""):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        response["Cache-Control"] = f"public, max-age={self.max_age[kind]}"
+        return response
+
+    def _get_resources(self):
+        version = versioned_cache.get_version(models.SiteSettings.CACHE_VERSION_NAME)
+        cached_version, resources = self._cached
+        if cached_version != version:
+            resources = self._build_resources()
+            self._cached = (version, resources)
+        return resources
+
+    @staticmethod
+    def _resource(content, content_type):
+        return content, content_type, quote_etag(hashlib.md5(content).hexdigest())
+
+    def _build_resources(self):
+        try:
+            site_settings = models.SiteSettings.get()
+        except (models.SiteSettings.DoesNotExist, models.SiteSettings.MultipleObjectsReturned):
+            site_settings = models.SiteSettings()
+
+        resources = {"robots": self._resource(site_settings.robots.encode(), "text/plain; charset=utf-8")}
+        if site_settings.favicon:
+            with site_settings.favicon.open("rb") as f:
+                content = f.read()
+            content_type, _ = mimetypes.guess_type(site_settings.favicon.name)
+            resources["favicon"] = self._resource(content, content_type or "image/x-icon")
+        return resources
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-16 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_question_answeroption_survey_question_survey_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersurvey',
+            name='answered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersurvey',
+            name='last_answered_order',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
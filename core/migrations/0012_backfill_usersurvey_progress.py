@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def backfill_progress(apps, schema_editor):
+    """
+    Заполняет курсор прогресса по уже сохранённым ответам
+
+    Курсор ставится на последний вопрос непрерывно отвеченного начала опроса,
+    чтобы ответы, данные не по порядку, не скрыли пропущенные вопросы
+    """
+    Question = apps.get_model('core', 'Question')
+    UserSurvey = apps.get_model('core', 'UserSurvey')
+    UserAnswer = apps.get_model('core', 'UserAnswer')
+
+    survey_orders = defaultdict(list)
+    for survey_id, order in Question.objects.order_by('survey_id', 'order').values_list('survey_id', 'order'):
+        survey_orders[survey_id].append(order)
+
+    answered_orders = defaultdict(set)
+    for user_survey_id, order in UserAnswer.objects.values_list('user_survey_id', 'question__order').iterator():
+        answered_orders[user_survey_id].add(order)
+
+    user_surveys = []
+    for user_survey in UserSurvey.objects.only('id', 'survey_id').iterator():
+        answered = answered_orders.get(user_survey.id, set())
+        user_survey.answered_count = len(answered)
+        user_survey.last_answered_order = None
+        for order in survey_orders.get(user_survey.survey_id, []):
+            if order not in answered:
+                break
+            user_survey.last_answered_order = order
+        user_surveys.append(user_survey)
+
+    UserSurvey.objects.bulk_update(user_surveys, ['answered_count', 'last_answered_order'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_usersurvey_answered_count_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
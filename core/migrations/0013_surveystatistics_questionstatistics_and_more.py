@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-16 11:40
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_backfill_usersurvey_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyStatistics',
+            fields=[
+                ('survey', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='core.survey')),
+                ('finished_count', models.PositiveIntegerField(default=0)),
+                ('duration_sum', models.DurationField(default=datetime.timedelta)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AnswerOptionStatistics',
+            fields=[
+                ('option', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='core.answeroption')),
+                ('votes', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-16 13:25
+
+from django.db import migrations
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_answers(apps, schema_editor):
+    """Оставляет самый ранний ответ на вопрос, иначе ограничение не создать"""
+    UserSurvey = apps.get_model('core', 'UserSurvey')
+    UserAnswer = apps.get_model('core', 'UserAnswer')
+
+    duplicates = UserAnswer.objects.values('user_survey_id', 'question_id').annotate(
+        first_id=Min('id'), total=Count('id')
+    ).filter(total__gt=1)
+
+    user_survey_ids = set()
+    for row in duplicates:
+        UserAnswer.objects.filter(
+            user_survey_id=row['user_survey_id'], question_id=row['question_id']
+        ).exclude(id=row['first_id']).delete()
+        user_survey_ids.add(row['user_survey_id'])
+
+    answers = UserAnswer.objects.filter(user_survey=OuterRef('pk')).order_by().values('user_survey')
+    UserSurvey.objects.filter(id__in=user_survey_ids).update(
+        answered_count=Coalesce(Subquery(answers.annotate(cnt=Count('id')).values('cnt')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_surveystatistics_questionstatistics_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_answers, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='useranswer',
+            unique_together={('user_survey', 'question')},
+        ),
+    ]
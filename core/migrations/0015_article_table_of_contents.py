@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-16 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_alter_useranswer_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='table_of_contents',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Оглавление'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-16 16:30
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_publish_at(apps, schema_editor):
+    """Опубликованным вручную статьям проставляем дату публикации по дате создания"""
+    Article = apps.get_model('core', 'Article')
+    Article.objects.filter(is_published=True, publish_at__isnull=True).update(publish_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_article_updated_at_textpage_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_publish_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['publish_at', 'id'], name='core_article_published_idx'),
+        ),
+    ]
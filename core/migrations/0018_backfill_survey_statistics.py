@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-16 18:10
+
+from django.db import migrations
+
+from core.statistics import rebuild_survey_statistics
+
+
+def backfill_statistics(apps, schema_editor):
+    """Заполняет агрегаты по ответам, сохранённым до их появления"""
+    rebuild_survey_statistics(get_model=apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_article_published_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_statistics, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
+import hashlib
 import pdb
 
-from django.http import Http404
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.utils.http import quote_etag
 
-from . import models
+from . import models, site_chrome
+from .cache import get_versions
 
 
 class TextPageMixin:
@@ -62,6 +66,49 @@ class TextPageMixin:
         return ctx
 
 
+class CachedTextPageMixin:
+    """
+    Отдаёт анонимным пользователям закэшированный HTML текстовой страницы
+    Ставится перед TextPageMixin, заголовок ETag позволяет ConditionalGetMiddleware отвечать 304
+
+    Last-Modified не отдаётся: HTML зависит и от меню, контактов и настроек сайта,
+    у которых нет общей даты изменения, и по одной дате страницы клиент получил бы 304 на устаревшую копию
+
+    Ключ включает версии меню, общих данных и настроек сайта, поэтому любая правка
+    TextPage или данных из базового шаблона делает старую копию недоступной
+    """
+
+    page_cache_timeout = 60 * 60 * 24
+
+    def _get_page_cache_key(self, slug):
+        versions = get_versions(
+            site_chrome.MENU_VERSION_NAME,
+            site_chrome.CHROME_VERSION_NAME,
+            models.SiteSettings.CACHE_VERSION_NAME,
+        )
+        return f"text_page:{slug}:" + ":".join(map(str, versions))
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        key = self._get_page_cache_key(self._get_page_slug())
+        cached = cache.get(key)
+        if cached is None:
+            response = super().get(request, *args, **kwargs)
+            response.render()
+            cached = {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "etag": quote_etag(hashlib.md5(response.content).hexdigest()),
+            }
+            cache.set(key, cached, timeout=self.page_cache_timeout)
+
+        response = HttpResponse(cached["content"], content_type=cached["content_type"])
+        response["ETag"] = cached["etag"]
+        return response
+
+
 class CanonicalMixin:
     """
     Проверяет наличие  GET query,  добавляет в контекст пометку is_canonical
@@ -2,3 +2,4 @@ from .misc import SiteSettings
 from .textpage import TextPage, Article
 from .telegram import TelegramBotCredentials
 from .misc import *
+from .statistics import SurveyStatistics, AnswerOptionStatistics
@@ -25,6 +25,8 @@ class BaseSEOModel(models.Model):
     seo_description = models.CharField(max_length=500, verbose_name="Description", blank=True)
     seo_keywords = models.CharField(max_length=500, verbose_name="Keywords", blank=True)
 
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата изменения")
+
     def __str__(self):
         return self.name
 
@@ -1,6 +1,9 @@
+from django.core.cache import cache as django_cache
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from core import cache as versioned_cache
+
 User = get_user_model()
 
 
@@ -14,11 +17,31 @@ class SiteSettings(models.Model):
     extra_head_html = models.TextField(blank=True)
     extra_body_html = models.TextField(blank=True)
 
+    CACHE_VERSION_NAME = "site_settings"
+
     @classmethod
     def get(cls):
-        if not hasattr(cls, "_cached_obj"):
-            cls._cached_obj = cls.objects.get()
-        return cls._cached_obj
+        """
+        Настройки из памяти процесса, пока не сменилась версия в общем кэше
+        На запрос приходится один GET версии, БД читается только после правок
+        """
+        version = versioned_cache.get_version(cls.CACHE_VERSION_NAME)
+        cached_version, cached_obj = getattr(cls, "_cached", (None, None))
+        if cached_version == version:
+            return cached_obj
+
+        key = f"{cls.CACHE_VERSION_NAME}:v{version}"
+        obj = django_cache.get(key)
+        if obj is None:
+            obj = cls.objects.get()
+            django_cache.set(key, obj, timeout=None)
+
+        cls._cached = (version, obj)
+        return obj
+
+    @classmethod
+    def invalidate_cache(cls):
+        versioned_cache.bump_version_on_commit(cls.CACHE_VERSION_NAME)
 
     def __str__(self):
         return "Настройки сайта"
@@ -116,14 +139,53 @@ class UserSurvey(models.Model):
     survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name='responses')
     started_at = models.DateTimeField(auto_now_add=True)
     finished_at = models.DateTimeField(null=True, blank=True)
+    # Курсор прогресса: порядок последнего вопроса, до которого отвечены все, и число ответов
+    last_answered_order = models.PositiveIntegerField(null=True, blank=True)
+    answered_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('user', 'survey')
 
+    def get_pending_questions(self) -> list:
+        """
+        :rtype: list
+        :return: Список (id, order, answered) вопросов после курсора по порядку
+        """
+        questions = Question.objects.filter(survey_id=self.survey_id)
+        if self.last_answered_order is not None:
+            questions = questions.filter(order__gt=self.last_answered_order)
+        return list(
+            questions.annotate(
+                answered=models.Exists(UserAnswer.objects.filter(user_survey=self, question=models.OuterRef('pk')))
+            ).order_by('order').values_list('id', 'order', 'answered')
+        )
+
+    @staticmethod
+    def get_expected_question_ids(pending, count=1) -> list:
+        """Первые count неотвеченных вопросов, только на них сейчас можно ответить"""
+        return [question_id for question_id, _, answered in pending if not answered][:count]
+
+    def register_answers(self, pending, question_ids) -> bool:
+        """
+        Сдвигает курсор по непрерывно отвеченным вопросам
+
+        :rtype: bool
+        :return: True, если неотвеченных вопросов не осталось
+        """
+        self.answered_count += len(question_ids)
+        for question_id, order, answered in pending:
+            if not answered and question_id not in question_ids:
+                return False
+            self.last_answered_order = order
+        return True
+
 
 class UserAnswer(models.Model):
     """Ответ пользователя на конкретный вопрос"""
     user_survey = models.ForeignKey(UserSurvey, on_delete=models.CASCADE, related_name='answers')
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     selected_option = models.ForeignKey(AnswerOption, on_delete=models.CASCADE)
-    answered_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    answered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user_survey', 'question')
\ No newline at end of file
@@ -0,0 +1,60 @@
+import datetime
+
+from django.db import models
+from django.db.models import F
+
+from .misc import Survey, AnswerOption
+
+
+class BaseCounterModel(models.Model):
+    """Агрегат, который обновляется атомарными инкрементами"""
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def increment(cls, lookup: dict, **deltas):
+        """
+        Увеличивает счётчики строки агрегата, создавая её при первом обращении
+
+        :param lookup: Поля, по которым ищется строка агрегата
+        :param deltas: Приращения счётчиков
+        """
+        expressions = {field: F(field) + delta for field, delta in deltas.items()}
+        if cls.objects.filter(**lookup).update(**expressions):
+            return
+
+        _, created = cls.objects.get_or_create(**lookup, defaults=deltas)
+        if not created:
+            # Строку успел создать параллельный запрос
+            cls.objects.filter(**lookup).update(**expressions)
+
+    @classmethod
+    def increment_many(cls, key_field: str, keys, **deltas):
+        """
+        Увеличивает счётчики сразу для набора строк агрегата за два запроса
+
+        :param key_field: Имя поля-ключа строки агрегата
+        :param keys: Уникальные значения ключа
+        :param deltas: Приращения счётчиков для каждой строки
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        cls.objects.bulk_create([cls(**{key_field: key}) for key in keys], ignore_conflicts=True)
+        cls.objects.filter(**{f'{key_field}__in': keys}).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+
+class SurveyStatistics(BaseCounterModel):
+    """Сводная статистика завершённых прохождений опроса"""
+    survey = models.OneToOneField(Survey, on_delete=models.CASCADE, primary_key=True, related_name='statistics')
+    finished_count = models.PositiveIntegerField(default=0)
+    duration_sum = models.DurationField(default=datetime.timedelta)
+
+
+class AnswerOptionStatistics(BaseCounterModel):
+    """Количество голосов за вариант ответа"""
+    option = models.OneToOneField(AnswerOption, on_delete=models.CASCADE, primary_key=True, related_name='statistics')
+    votes = models.PositiveIntegerField(default=0)
@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models import OuterRef, Q, Subquery
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
 from .base import BaseMenuItemModel, BaseSEOModel
 from bs4 import BeautifulSoup
 
@@ -19,7 +22,48 @@ class TextPage(BaseMenuItemModel, BaseSEOModel):
     )
 
     def get_absolute_url(self):
-        return reverse('text_page', kwargs={'page_slug': self.slug})
+        return reverse('core:text_page', kwargs={'page_slug': self.slug})
+
+
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+
+def build_table_of_contents(content: str) -> tuple:
+    """
+    Строит оглавление по тегам h, заголовкам без id проставляет якоря из slug текста
+
+    :rtype: tuple
+    :return: HTML контента (с добавленными id) и список заголовков с якорными ссылками
+    """
+    soup = BeautifulSoup(content, "html.parser")
+    headers = soup.find_all(HEADING_TAGS)
+    used_ids = {header['id'] for header in headers if header.get('id')}
+
+    changed = False
+    table_of_contents = []
+    for header in headers:
+        text = header.get_text(strip=True)
+        if not header.get('id'):
+            base = slugify(text, allow_unicode=True) or "section"
+            anchor, suffix = base, 1
+            while anchor in used_ids:
+                suffix += 1
+                anchor = f"{base}-{suffix}"
+            header['id'] = anchor
+            used_ids.add(anchor)
+            changed = True
+        table_of_contents.append({'header': text, 'slug': header['id']})
+
+    return (str(soup) if changed else content), table_of_contents
+
+
+def _after(publish_at, pk):
+    """Условие "позже в ленте" для ключа (publish_at, id)"""
+    return Q(publish_at__gt=publish_at) | Q(publish_at=publish_at, id__gt=pk)
+
+
+def _before(publish_at, pk):
+    return Q(publish_at__lt=publish_at) | Q(publish_at=publish_at, id__lt=pk)
 
 
 class ArticleManager(models.Manager):
@@ -27,6 +71,38 @@ class ArticleManager(models.Manager):
     def get_published(self):
         return super().get_queryset().filter(is_published=True)
 
+    def publish_due(self, now) -> list:
+        """
+        Публикует все статьи с наступившей датой публикации одним UPDATE
+
+        :rtype: list
+        :return: id опубликованных статей
+        """
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET is_published = TRUE, updated_at = %s "
+                f"WHERE is_published = FALSE AND publish_at <= %s RETURNING id",
+                [now, now]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_published_with_neighbours(self):
+        """
+        Опубликованные статьи с slug и названием соседних статей в ленте
+        Соседи достаются коррелированными подзапросами LIMIT 1 по частичному индексу,
+        так что страница статьи обходится одним запросом
+        """
+        published = self.get_published()
+        following = published.filter(_after(OuterRef('publish_at'), OuterRef('id'))).order_by('publish_at', 'id')
+        preceding = published.filter(_before(OuterRef('publish_at'), OuterRef('id'))).order_by('-publish_at', '-id')
+        return published.annotate(
+            next_slug=Subquery(following.values('slug')[:1]),
+            next_name=Subquery(following.values('name')[:1]),
+            previous_slug=Subquery(preceding.values('slug')[:1]),
+            previous_name=Subquery(preceding.values('name')[:1]),
+        )
+
 
 class Article(BaseSEOModel):
     is_published = models.BooleanField(default=False, verbose_name="Опубликовано")
@@ -34,12 +110,31 @@ class Article(BaseSEOModel):
     publish_at = models.DateTimeField(verbose_name="Дата публикации", help_text="Используется для отложенного постинга",
                                       null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    table_of_contents = models.JSONField(verbose_name="Оглавление", default=list, blank=True, editable=False)
 
     objects = ArticleManager()
 
     def __str__(self):
         return self.name
 
+    def get_absolute_url(self):
+        return reverse('core:article', kwargs={'slug': self.slug})
+
+    def save(self, *args, **kwargs):
+        # Оглавление пересчитывается только вместе с контентом
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.content, self.table_of_contents = build_table_of_contents(self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'table_of_contents'}
+
+        # Ключ ленты (publish_at, id) должен быть заполнен у всех опубликованных статей
+        if self.is_published and self.publish_at is None:
+            self.publish_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'publish_at'}
+        super().save(*args, **kwargs)
+
     def publish(self):
         """Функция для публикации статьи"""
         self.is_published = True
@@ -47,24 +142,33 @@ class Article(BaseSEOModel):
 
     @property
     def next_article(self):
-        return self.get_next_by_created_at()
+        return Article.objects.get_published().filter(
+            _after(self.publish_at, self.pk)
+        ).order_by('publish_at', 'id').first()
 
     @property
     def previous_article(self):
-        return self.get_previous_by_created_at()
+        return Article.objects.get_published().filter(
+            _before(self.publish_at, self.pk)
+        ).order_by('-publish_at', '-id').first()
 
     @property
     def heading_structure(self) -> list:
         """
-        Метод для получения оглавления статьи на основе тегов h
+        Оглавление статьи на основе тегов h, рассчитывается при сохранении
 
         :rtype: list
         :return: Список заголовков и якорных ссылок
         """
-        soup = BeautifulSoup(self.content, "html.parser")
-        headers = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-        return [{'header': header.get_text(), 'slug': header['id']} for header in headers]
+        return self.table_of_contents
 
     class Meta:
         verbose_name = "Статья"
         verbose_name_plural = "Статьи"
+        indexes = [
+            models.Index(
+                fields=['publish_at', 'id'],
+                name='core_article_published_idx',
+                condition=Q(is_published=True),
+            ),
+        ]
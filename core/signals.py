@@ -0,0 +1,57 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+
+from . import cache, models, site_chrome, sitemap_cache
+
+# Отправляется один раз на пачку статей, опубликованных по расписанию, аргумент ids
+articles_published = Signal()
+
+
+def survey_structure_version_name(survey_id) -> str:
+    return f"survey:{survey_id}:structure"
+
+
+@receiver([post_save, post_delete], sender=models.Question)
+def invalidate_question_structure(sender, instance, **kwargs):
+    cache.bump_version_on_commit(survey_structure_version_name(instance.survey_id))
+
+
+@receiver([post_save, post_delete], sender=models.AnswerOption)
+def invalidate_answer_option_structure(sender, instance, **kwargs):
+    survey_id = models.Question.objects.filter(pk=instance.question_id).values_list('survey_id', flat=True).first()
+    if survey_id is not None:
+        cache.bump_version_on_commit(survey_structure_version_name(survey_id))
+
+
+@receiver([post_save, post_delete], sender=models.CompanyContacts)
+@receiver([post_save, post_delete], sender=models.ExtraFields)
+def invalidate_site_chrome(sender, instance, **kwargs):
+    site_chrome.invalidate()
+
+
+@receiver([post_save, post_delete], sender=models.TextPage)
+def invalidate_text_page_menu(sender, instance, **kwargs):
+    site_chrome.invalidate_menu()
+
+
+@receiver([post_save, post_delete], sender=models.SiteSettings)
+def invalidate_site_settings(sender, instance, **kwargs):
+    models.SiteSettings.invalidate_cache()
+
+
+@receiver([post_save, post_delete], sender=models.TextPage)
+@receiver([post_save, post_delete], sender=models.Article)
+def invalidate_sitemap(sender, instance, **kwargs):
+    sitemap_cache.invalidate()
+
+
+@receiver(articles_published)
+def invalidate_sitemap_on_publish(sender, ids, **kwargs):
+    sitemap_cache.invalidate()
+
+
+@receiver([post_save, post_delete], sender=models.TelegramBotCredentials)
+def invalidate_telegram_credentials(sender, instance, **kwargs):
+    from utils.telegram import tasks
+
+    tasks.invalidate_credentials()
@@ -0,0 +1,82 @@
+"""
+Кэш общих для всех страниц данных: контакты, доп. поля и меню из текстовых страниц
+
+Данные лежат в общем кэше под версионированными ключами, версии меняют сигналы при правках.
+Каждый процесс дополнительно держит последнюю прочитанную версию в памяти,
+так что на запрос приходится один GET версии из кэша и ни одного запроса в БД.
+"""
+import dataclasses
+
+from django.core.cache import cache
+
+from . import cache as versioned_cache, models
+
+CHROME_VERSION_NAME = "site_chrome"
+MENU_VERSION_NAME = "text_page_menu"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# имя версии -> (версия, данные) последнего чтения в этом процессе
+_local = {}
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class MenuItem:
+    """Пункт меню, построенный по полям BaseMenuItemModel текстовой страницы"""
+    slug: str
+    name: str
+    menu_title: str
+    menu_position: int
+
+    @property
+    def title(self):
+        return self.menu_title or self.name
+
+
+def _get_cached(version_name, loader):
+    version = versioned_cache.get_version(version_name)
+    local_version, data = _local.get(version_name, (None, None))
+    if local_version == version:
+        return data
+
+    key = f"{version_name}:v{version}"
+    data = cache.get(key)
+    if data is None:
+        data = loader()
+        cache.set(key, data, timeout=CACHE_TIMEOUT)
+
+    _local[version_name] = (version, data)
+    return data
+
+
+def _load_chrome() -> dict:
+    return {
+        "contacts": models.CompanyContacts.objects.first(),
+        "extra_fields": {f.key: f for f in models.ExtraFields.objects.all()},
+    }
+
+
+def _load_menu() -> dict:
+    rows = models.TextPage.objects.order_by("menu_position", "pk").values_list(
+        "slug", "name", "menu_title", "menu_position"
+    )
+    return {row[0]: MenuItem(*row) for row in rows}
+
+
+def get_site_chrome() -> dict:
+    return _get_cached(CHROME_VERSION_NAME, _load_chrome)
+
+
+def get_menu() -> dict:
+    """
+    :rtype: dict
+    :return: Пункты меню по slug в порядке menu_position
+    """
+    return _get_cached(MENU_VERSION_NAME, _load_menu)
+
+
+def invalidate() -> None:
+    versioned_cache.bump_version_on_commit(CHROME_VERSION_NAME)
+
+
+def invalidate_menu() -> None:
+    versioned_cache.bump_version_on_commit(MENU_VERSION_NAME)
@@ -0,0 +1,98 @@
+"""
+Кэш готовых XML карты сайта: индекс и отдельный файл на каждый раздел
+
+Ключ включает раздел, страницу и версию; версию меняют сигналы при правках
+страниц и статей, так что всплески запросов от краулеров не доходят до БД.
+Ссылки строятся от settings.SITE_URL, а не от заголовка Host: при ALLOWED_HOSTS = ['*']
+каждый новый Host иначе собирал бы карту заново и плодил записи в кэше.
+"""
+import gzip
+import hashlib
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.sitemaps.views import SitemapIndexItem
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import http_date
+
+from . import cache as versioned_cache
+
+VERSION_NAME = "sitemap"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _latest(dates):
+    dates = [d for d in dates if d is not None]
+    return max(dates) if dates else None
+
+
+def _artifact(content, last_modified):
+    content = content.encode()
+    etag = hashlib.md5(content).hexdigest()
+    return {
+        "content": content,
+        "etag": '"%s"' % etag,
+        # Сжатая копия, чтобы не гонять gzip на каждый запрос краулера
+        "gzip_content": gzip.compress(content, mtime=0),
+        "gzip_etag": '"%s-gzip"' % etag,
+        "last_modified": http_date(last_modified.timestamp()) if last_modified else None,
+    }
+
+
+def _canonical_site():
+    """Схема и несохранённый Site с доменом из SITE_URL, get_urls берёт из него только domain"""
+    url = urlsplit(settings.SITE_URL)
+    return url.scheme, Site(domain=url.netloc, name=url.netloc)
+
+
+def _build_index(sitemaps):
+    base_url = settings.SITE_URL.rstrip("/")
+    items = []
+    for section, site in sitemaps.items():
+        site = site()
+        location = base_url + reverse("core:sitemap-section", kwargs={"section": section})
+        last_mod = site.get_latest_lastmod()
+        for page in range(1, site.paginator.num_pages + 1):
+            items.append(SitemapIndexItem(location if page == 1 else f"{location}?p={page}", last_mod))
+
+    content = render_to_string("sitemap_index.xml", {"sitemaps": items})
+    return _artifact(content, _latest(item.last_mod for item in items))
+
+
+def _build_section(site, page):
+    protocol, canonical_site = _canonical_site()
+    site = site()
+    urls = site.get_urls(page=page, site=canonical_site, protocol=protocol)
+    content = render_to_string("sitemap.xml", {"urlset": urls})
+    return _artifact(content, _latest(url.get("lastmod") for url in urls))
+
+
+def get_sitemap(section=None, page=1) -> dict:
+    """
+    :rtype: dict
+    :return: XML, ETag и Last-Modified индекса или раздела карты сайта
+    :raises KeyError: Раздел не найден
+    :raises EmptyPage, PageNotAnInteger: Некорректная страница раздела
+    """
+    from .views.sitemaps import SITEMAPS
+
+    if section is not None and section not in SITEMAPS:
+        raise KeyError(section)
+
+    version = versioned_cache.get_version(VERSION_NAME)
+    key = f"sitemap:{section or 'index'}:{page}:v{version}"
+    artifact = cache.get(key)
+    if artifact is None:
+        if section is None:
+            artifact = _build_index(SITEMAPS)
+        else:
+            artifact = _build_section(SITEMAPS[section], page)
+        cache.set(key, artifact, timeout=CACHE_TIMEOUT)
+    return artifact
+
+
+def invalidate() -> None:
+    versioned_cache.bump_version_on_commit(VERSION_NAME)
@@ -0,0 +1,49 @@
+"""
+Пересчёт агрегатов статистики опросов по сохранённым ответам
+
+Модели получаются через get_model, чтобы пересчёт работал и в миграциях с историческими моделями
+"""
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, Sum, F, ExpressionWrapper, DurationField
+
+
+def rebuild_survey_statistics(survey_id=None, get_model=global_apps.get_model) -> None:
+    """
+    :param survey_id: id опроса, по умолчанию пересчитываются все
+    :param get_model: apps.get_model приложения или миграции
+    """
+    UserAnswer = get_model('core', 'UserAnswer')
+    UserSurvey = get_model('core', 'UserSurvey')
+    AnswerOptionStatistics = get_model('core', 'AnswerOptionStatistics')
+    SurveyStatistics = get_model('core', 'SurveyStatistics')
+
+    answers = UserAnswer.objects.all()
+    user_surveys = UserSurvey.objects.filter(finished_at__isnull=False)
+    option_stats = AnswerOptionStatistics.objects.all()
+    survey_stats = SurveyStatistics.objects.all()
+    if survey_id is not None:
+        answers = answers.filter(question__survey_id=survey_id)
+        user_surveys = user_surveys.filter(survey_id=survey_id)
+        option_stats = option_stats.filter(option__question__survey_id=survey_id)
+        survey_stats = survey_stats.filter(survey_id=survey_id)
+
+    with transaction.atomic():
+        option_stats.delete()
+        survey_stats.delete()
+
+        AnswerOptionStatistics.objects.bulk_create(
+            AnswerOptionStatistics(option_id=row['selected_option_id'], votes=row['total'])
+            for row in answers.values('selected_option_id').annotate(total=Count('id'))
+        )
+        SurveyStatistics.objects.bulk_create(
+            SurveyStatistics(
+                survey_id=row['survey_id'],
+                finished_count=row['total'],
+                duration_sum=row['duration_sum'],
+            )
+            for row in user_surveys.values('survey_id').annotate(
+                total=Count('id'),
+                duration_sum=Sum(ExpressionWrapper(F('finished_at') - F('started_at'), output_field=DurationField())),
+            )
+        )
@@ -0,0 +1,53 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен, без него создаются только .gz
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage, который при collectstatic кладёт рядом с файлами
+    сжатые копии .gz и .br (если установлен brotli)
+    """
+
+    compress_extensions = (".css", ".js", ".mjs", ".map", ".json", ".svg", ".xml", ".txt", ".html", ".ico")
+    compress_min_size = 512
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, processed
+            if not isinstance(processed, Exception):
+                names.add(name)
+                if hashed_name:
+                    names.add(hashed_name)
+
+        if dry_run:
+            return
+
+        for name in sorted(names):
+            if name.endswith(self.compress_extensions):
+                self._compress(self.path(name))
+
+    def _compress(self, path):
+        with open(path, "rb") as f:
+            content = f.read()
+        if len(content) < self.compress_min_size:
+            return
+
+        variants = [(".gz", gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(content)))
+
+        for suffix, compressed in variants:
+            # Сжатая копия нужна только если она действительно меньше
+            if len(compressed) < len(content):
+                with open(path + suffix, "wb") as f:
+                    f.write(compressed)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
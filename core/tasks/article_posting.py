@@ -1,15 +1,14 @@
-import pdb
-
 from django.utils import timezone
 
 from _project_.celery import app
 from core.models import Article
+from core.signals import articles_published
 
 
 @app.task(name="core.tasks.publish_scheduled_articles")
 def publish_scheduled_articles():
-    now = timezone.now()
-    articles_to_publish = Article.objects.filter(is_published=False, publish_at__lte=now)
+    published_ids = Article.objects.publish_due(timezone.now())
 
-    for article in articles_to_publish:
-        article.publish()
+    # Один сигнал на всю пачку: инвалидация кэшей и перегенерация карты сайта
+    if published_ids:
+        articles_published.send(sender=Article, ids=published_ids)
@@ -1,3 +1,3 @@
-from .seo import robots_txt_view, sitemap, TextPageSitemap
-from .textpage import GenericTextPageView
-from .sitemaps import TextPageSitemap, StaticViewsSitemap, IndexSitemap
+from .seo import robots_txt_view, sitemap
+from .textpage import GenericTextPageView, ArticleDetailView
+from .sitemaps import TextPageSitemap, ArticleSitemap, StaticViewsSitemap, IndexSitemap
@@ -1,15 +1,9 @@
-import datetime
-
-from calendar import timegm
-from django.contrib.sitemaps import Sitemap
 from django.contrib.sitemaps.views import x_robots_tag
-from django.contrib.sites.requests import RequestSite
 from django.core.paginator import EmptyPage, PageNotAnInteger
 from django.http import Http404, HttpResponse
-from django.template.response import TemplateResponse
-from django.utils.http import http_date
+from django.utils.cache import patch_vary_headers
 
-from core import models
+from core import http, models, sitemap_cache
 
 
 def robots_txt_view(request):
@@ -17,56 +11,30 @@ def robots_txt_view(request):
     return HttpResponse(site_settings.robots, content_type="text/plain")
 
 
-class TextPageSitemap(Sitemap):
-    changefreq = "weekly"
-    priority = 0.5
-
-    def items(self):
-        return models.TextPage.objects.filter(slug__isnull=False, show_in_sitemap=True)
-
-
 @x_robots_tag
-def sitemap(
-        request,
-        sitemaps,
-        section=None,
-        template_name="sitemap.xml",
-        content_type="application/xml",
-):
-    req_protocol = request.scheme
-    req_site = RequestSite(request)
-
-    if section is not None:
-        if section not in sitemaps:
-            raise Http404("No sitemap available for section: %r" % section)
-        maps = [sitemaps[section]]
-    else:
-        maps = sitemaps.values()
+def sitemap(request, section=None, content_type="application/xml"):
+    """
+    Индекс карты сайта или отдельный раздел из заранее собранного кэша
+    ETag и Last-Modified позволяют ConditionalGetMiddleware отвечать 304
+    """
     page = request.GET.get("p", 1)
-
-    urls = []
-    for site in maps:
-        try:
-            if callable(site):
-                site = site()
-            urls.extend(site.get_urls(
-                page=page, site=req_site, protocol=req_protocol))
-        except EmptyPage:
-            raise Http404("Page %s empty" % page)
-        except PageNotAnInteger:
-            raise Http404("No page '%s'" % page)
-    response = TemplateResponse(
-        request, template_name, {"urlset": urls}, content_type=content_type
-    )
-    if hasattr(site, "latest_lastmod"):
-        # if latest_lastmod is defined for site, set header so as
-        # ConditionalGetMiddleware is able to send 304 NOT MODIFIED
-        lastmod = site.latest_lastmod
-        response["Last-Modified"] = http_date(
-            timegm(
-                lastmod.utctimetuple()
-                if isinstance(lastmod, datetime.datetime)
-                else lastmod.timetuple()
-            )
-        )
+    try:
+        artifact = sitemap_cache.get_sitemap(section, int(page))
+    except KeyError:
+        raise Http404("No sitemap available for section: %r" % section)
+    except EmptyPage:
+        raise Http404("Page %s empty" % page)
+    except (PageNotAnInteger, ValueError):
+        raise Http404("No page '%s'" % page)
+
+    if "gzip" in http.accepted_encodings(request):
+        response = HttpResponse(artifact["gzip_content"], content_type=content_type)
+        response["Content-Encoding"] = "gzip"
+        response["ETag"] = artifact["gzip_etag"]
+    else:
+        response = HttpResponse(artifact["content"], content_type=content_type)
+        response["ETag"] = artifact["etag"]
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if artifact["last_modified"]:
+        response["Last-Modified"] = artifact["last_modified"]
     return response
@@ -9,7 +9,21 @@ class TextPageSitemap(Sitemap):
     priority = 0.5
 
     def items(self):
-        return models.TextPage.objects.filter(is_generic_page=True, show_in_sitemap=True)
+        return models.TextPage.objects.filter(is_generic_page=True, show_in_sitemap=True).order_by("pk")
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+class ArticleSitemap(Sitemap):
+    changefreq = "weekly"
+    priority = 0.6
+
+    def items(self):
+        return models.Article.objects.get_published().filter(show_in_sitemap=True).order_by("publish_at", "id")
+
+    def lastmod(self, obj):
+        return obj.updated_at
 
 
 class IndexSitemap(Sitemap):
@@ -34,3 +48,11 @@ class StaticViewsSitemap(Sitemap):
 
     def location(self, item):
         return reverse(item)
+
+
+SITEMAPS = {
+    'index': IndexSitemap,
+    'textpage': TextPageSitemap,
+    'article': ArticleSitemap,
+    'staticviews': StaticViewsSitemap,
+}
@@ -3,7 +3,7 @@ from django.views import generic
 from core import mixins, models
 
 
-class GenericTextPageView(mixins.TextPageMixin, generic.TemplateView):
+class GenericTextPageView(mixins.CachedTextPageMixin, mixins.TextPageMixin, generic.TemplateView):
 
     def _get_page_slug(self):
         return self.kwargs["page_slug"]
@@ -16,3 +16,10 @@ class GenericTextPageView(mixins.TextPageMixin, generic.TemplateView):
             is_generic_page=True,
             slug=self.page_slug
         )
+
+
+class ArticleDetailView(mixins.CanonicalMixin, generic.DetailView):
+    template_name = "pages/article.html"
+
+    def get_queryset(self):
+        return models.Article.objects.get_published()
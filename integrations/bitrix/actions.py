@@ -1,28 +1,20 @@
-import pdb
-
-from django.template import Template, Context
-
-from . import tasks, api_urls, models
+from . import config, tasks, models
 
 
 def create_lead(name, phone, email=None, **extra_fields):
-    site_settings = models.Settings.objects.first()
-    if site_settings.bitrix_webhook_url:
-        urls = api_urls.BitrixApiUrls(site_settings.bitrix_webhook_url)
+    """Ставит лид в очередь, заголовок рендерится и отправляется уже в celery"""
+    bitrix_config = config.get_config()
+    if bitrix_config is None:
+        return
 
-        title_template = Template(site_settings.bitrix_lead_title_template)
-        title = title_template.render(Context({
+    if bitrix_config.batch_leads:
+        # Лид уйдёт в Битрикс вместе с другими через flush_pending_leads
+        models.PendingLead.objects.create(data={
+            "name": name,
             "phone": phone,
-            **extra_fields
-        }))
+            "email": email,
+            "extra_fields": extra_fields,
+        })
+        return
 
-        tasks.create_lead.delay(
-            urls.create_lead_url,
-            site_settings.bitrix_custom_fields_map,
-            title,
-            name,
-            phone,
-            email=email,
-            **extra_fields
-        )
-        print(1)
+    tasks.send_lead.delay(name, phone, email=email, **extra_fields)
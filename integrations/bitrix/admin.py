@@ -9,3 +9,9 @@ class SiteSettingsAdmin(admin.ModelAdmin):
         # Разрешаем создать только один объект
         settings_count = models.Settings.objects.count()
         return settings_count < 1
+
+
+@admin.register(models.PendingLead)
+class PendingLeadAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_at", "attempts", "last_error")
+    readonly_fields = ("data", "claimed_until", "created_at")
@@ -12,3 +12,7 @@ class BitrixApiUrls:
     @property
     def create_lead_url(self):
         return f"{self._base_url}/crm.lead.add.json"
+
+    @property
+    def batch_url(self):
+        return f"{self._base_url}/batch.json"
@@ -0,0 +1,62 @@
+"""
+Настройки Битрикс, подготовленные для отправки лидов
+
+Шаблон заголовка компилируется один раз на версию настроек в каждом процессе,
+версию в общем кэше меняет сохранение Settings, так что запрос к БД нужен только после правок.
+"""
+import dataclasses
+
+from django.template import Context, Template
+
+from core import cache as versioned_cache
+
+from . import api_urls, models
+
+VERSION_NAME = "bitrix_settings"
+
+# (версия, конфиг) последнего чтения в этом процессе
+_local = (None, None)
+
+
+@dataclasses.dataclass(frozen=True)
+class BitrixConfig:
+    urls: api_urls.BitrixApiUrls
+    title_template: Template
+    custom_fields_map: dict
+    batch_leads: bool
+
+    def render_title(self, phone, **extra_fields):
+        return self.title_template.render(Context({
+            "phone": phone,
+            **extra_fields
+        }))
+
+
+def _load():
+    site_settings = models.Settings.objects.first()
+    if not site_settings or not site_settings.bitrix_webhook_url:
+        return None
+    return BitrixConfig(
+        urls=api_urls.BitrixApiUrls(site_settings.bitrix_webhook_url),
+        title_template=Template(site_settings.bitrix_lead_title_template),
+        custom_fields_map=site_settings.bitrix_custom_fields_map,
+        batch_leads=site_settings.batch_leads,
+    )
+
+
+def get_config():
+    """
+    :return: BitrixConfig или None, если интеграция выключена
+    """
+    global _local
+
+    version = versioned_cache.get_version(VERSION_NAME)
+    local_version, bitrix_config = _local
+    if local_version != version:
+        bitrix_config = _load()
+        _local = (version, bitrix_config)
+    return bitrix_config
+
+
+def invalidate():
+    versioned_cache.bump_version_on_commit(VERSION_NAME)
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-16 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bitrix', '0002_settings_bitrix_custom_fields_map'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settings',
+            name='batch_leads',
+            field=models.BooleanField(default=False, help_text='Лиды копятся в очереди и уходят в Битрикс через batch по 50 штук', verbose_name='Отправлять лиды пачками'),
+        ),
+        migrations.CreateModel(
+            name='PendingLead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(help_text='name, phone, email и extra_fields', verbose_name='Данные лида')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток отправки')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('claimed_until', models.DateTimeField(blank=True, help_text='Пока срок не истёк, лид не выбирается другими флашерами', null=True, verbose_name='Взят в отправку до')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Лид в очереди',
+                'verbose_name_plural': 'Лиды в очереди',
+            },
+        ),
+    ]
@@ -30,3 +30,27 @@ class Settings(models.Model):
                   'Где internal_field_key - внутреннее имя, UF_CRM_1689233493499 - имя поля в Битриксе</br>',
         default=get_default_bitrix_custom_fields_map
     )
+
+    batch_leads = models.BooleanField(
+        verbose_name="Отправлять лиды пачками",
+        help_text="Лиды копятся в очереди и уходят в Битрикс через batch по 50 штук",
+        default=False
+    )
+
+
+class PendingLead(models.Model):
+    """Лид в очереди на пакетную отправку в Битрикс"""
+    data = models.JSONField(verbose_name="Данные лида", help_text="name, phone, email и extra_fields")
+    attempts = models.PositiveSmallIntegerField(verbose_name="Попыток отправки", default=0)
+    last_error = models.TextField(verbose_name="Последняя ошибка", blank=True)
+    claimed_until = models.DateTimeField(
+        verbose_name="Взят в отправку до",
+        help_text="Пока срок не истёк, лид не выбирается другими флашерами",
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Лид в очереди"
+        verbose_name_plural = "Лиды в очереди"
@@ -0,0 +1,9 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import config, models
+
+
+@receiver([post_save, post_delete], sender=models.Settings)
+def invalidate_bitrix_config(sender, instance, **kwargs):
+    config.invalidate()
@@ -1,10 +1,23 @@
-import requests
+import datetime
+from urllib.parse import urlencode
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 
 from _project_.celery import app
+from utils import http
 
+from . import config, models
 
-@app.task()
-def create_lead(create_lead_url, fields_mapping, title, name, phone, email=None, **custom_fields):
+BATCH_SIZE = 50
+FLUSH_MAX_BATCHES = 10
+MAX_ATTEMPTS = 5
+# Срок, после которого лид, взятый упавшим флашером, снова доступен, с запасом на таймаут запроса
+CLAIM_TIMEOUT = datetime.timedelta(minutes=5)
+
+
+def _lead_params(title, fields_mapping, name, phone, email=None, **custom_fields):
     params = {
         "FIELDS[TITLE]": title,
         "FIELDS[NAME]": name,
@@ -19,5 +32,119 @@ def create_lead(create_lead_url, fields_mapping, title, name, phone, email=None,
         bitrix_field_name = fields_mapping.get(field_k)
         params[f"FIELDS[{bitrix_field_name}]"] = field_v
 
-    res = requests.get(create_lead_url, params, verify=False)
+    return params
+
+
+def build_lead_params(bitrix_config, name, phone, email=None, **custom_fields):
+    return _lead_params(
+        bitrix_config.render_title(phone, **custom_fields),
+        bitrix_config.custom_fields_map,
+        name,
+        phone,
+        email=email,
+        **custom_fields
+    )
+
+
+@app.task()
+def send_lead(name, phone, email=None, **custom_fields):
+    bitrix_config = config.get_config()
+    if bitrix_config is None:
+        return
+
+    params = build_lead_params(bitrix_config, name, phone, email=email, **custom_fields)
+    res = http.request("bitrix", "GET", bitrix_config.urls.create_lead_url, params=params, verify=False)
+    res.raise_for_status()
+
+
+@app.task(name="integrations.bitrix.tasks.create_lead")
+def create_lead_legacy(create_lead_url, fields_mapping, title, name, phone, email=None, **custom_fields):
+    """Задача под старым именем и в старом формате для лидов, поставленных в очередь до деплоя"""
+    params = _lead_params(title, fields_mapping, name, phone, email=email, **custom_fields)
+    res = http.request("bitrix", "GET", create_lead_url, params=params, verify=False)
+    res.raise_for_status()
+
+
+def _send_batch(bitrix_config, leads) -> dict:
+    """
+    Отправляет до 50 лидов одним вызовом batch
+
+    :rtype: dict
+    :return: Ошибка по id лида, для успешно созданных лидов None
+    """
+    data = {"halt": 0}
+    for lead in leads:
+        params = build_lead_params(
+            bitrix_config,
+            lead.data["name"],
+            lead.data["phone"],
+            email=lead.data.get("email"),
+            **lead.data.get("extra_fields", {})
+        )
+        data[f"cmd[lead_{lead.pk}]"] = f"crm.lead.add?{urlencode(params)}"
+
+    res = http.request("bitrix", "POST", bitrix_config.urls.batch_url, data=data, verify=False)
     res.raise_for_status()
+
+    # Пустые словари PHP отдаёт как [], поэтому приводим к dict
+    result = res.json().get("result") or {}
+    created = result.get("result") or {}
+    errors = result.get("result_error") or {}
+    created = created if isinstance(created, dict) else {}
+    errors = errors if isinstance(errors, dict) else {}
+
+    return {
+        lead.pk: None if created.get(f"lead_{lead.pk}") else str(errors.get(f"lead_{lead.pk}", "Нет результата"))
+        for lead in leads
+    }
+
+
+@app.task()
+def flush_pending_leads():
+    """
+    Разбирает очередь лидов пачками, неудачные лиды остаются в очереди на повтор
+
+    Пачка помечается взятой в короткой транзакции, запрос в Битрикс идёт без открытой транзакции,
+    результат записывается второй короткой транзакцией
+    """
+    bitrix_config = config.get_config()
+    if bitrix_config is None:
+        return
+
+    for _ in range(FLUSH_MAX_BATCHES):
+        now = timezone.now()
+        with transaction.atomic():
+            # skip_locked позволяет параллельным флашерам брать разные пачки
+            leads = list(
+                models.PendingLead.objects
+                .select_for_update(skip_locked=True)
+                .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now), attempts__lt=MAX_ATTEMPTS)
+                .order_by("id")[:BATCH_SIZE]
+            )
+            if not leads:
+                return
+            models.PendingLead.objects.filter(pk__in=[lead.pk for lead in leads]).update(
+                claimed_until=now + CLAIM_TIMEOUT
+            )
+
+        try:
+            results = _send_batch(bitrix_config, leads)
+        except Exception as e:
+            results = {lead.pk: repr(e) for lead in leads}
+
+        failed = []
+        for lead in leads:
+            error = results[lead.pk]
+            if error is not None:
+                lead.attempts += 1
+                lead.last_error = error
+                lead.claimed_until = None
+                failed.append(lead)
+
+        with transaction.atomic():
+            models.PendingLead.objects.filter(pk__in=[pk for pk, error in results.items() if error is None]).delete()
+            models.PendingLead.objects.bulk_update(failed, ["attempts", "last_error", "claimed_until"])
+
+        if len(failed) == len(leads):
+            # Битрикс недоступен или отклоняет всё, дожидаемся следующего запуска
+            return
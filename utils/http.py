@@ -0,0 +1,83 @@
+"""
+Общие HTTP-сессии интеграций с keep-alive и пулом соединений
+
+В каждом процессе воркера celery сессии создаются заново на worker_process_init,
+чтобы не делить сокеты с родительским процессом после fork.
+"""
+import dataclasses
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _project_ import constants
+
+
+@dataclasses.dataclass(frozen=True)
+class HttpPolicy:
+    timeout: float | tuple
+    retries: int
+    backoff_factor: float
+    pool_maxsize: int = 10
+    # False для API с побочными эффектами даже на GET: повторяются только ошибки соединения
+    idempotent: bool = True
+
+
+POLICIES = {
+    # crm.lead.add вызывается GET, повтор после таймаута чтения создал бы дубль лида
+    "bitrix": HttpPolicy(timeout=constants.BITRIX_TIMEOUT, retries=3, backoff_factor=0.5, idempotent=False),
+    "telegram": HttpPolicy(timeout=constants.TELEGRAM_TIMEOUT, retries=2, backoff_factor=0.3),
+}
+
+_sessions = {}
+
+
+def _create_session(policy: HttpPolicy) -> requests.Session:
+    # Повторяются ошибки соединения и 503 (запрос не обработан) для GET.
+    # POST после отправки не повторяется, чтобы не задвоить сообщение,
+    # для неидемпотентных API после отправки не повторяется ни один метод
+    if policy.idempotent:
+        retry = Retry(
+            total=policy.retries,
+            backoff_factor=policy.backoff_factor,
+            status_forcelist=(503,),
+            raise_on_status=False,
+        )
+    else:
+        retry = Retry(
+            total=policy.retries,
+            connect=policy.retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=policy.backoff_factor,
+            raise_on_status=False,
+        )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=policy.pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(integration: str) -> requests.Session:
+    session = _sessions.get(integration)
+    if session is None:
+        session = _sessions[integration] = _create_session(POLICIES[integration])
+    return session
+
+
+def reset_sessions() -> None:
+    """Закрывает сессии процесса и создаёт новые, вызывается после fork"""
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
+    for integration in POLICIES:
+        get_session(integration)
+
+
+def request(integration: str, method: str, url: str, **kwargs) -> requests.Response:
+    """requests.request через пул интеграции с её таймаутом по умолчанию"""
+    kwargs.setdefault("timeout", POLICIES[integration].timeout)
+    return get_session(integration).request(method, url, **kwargs)
@@ -0,0 +1,68 @@
+"""
+Очередь исходящих сообщений телеграм в Redis брокера celery, по списку на назначение чата
+"""
+import redis
+from django.conf import settings
+
+_BUFFER_KEY = "telegram:buffer:{kind}"
+_SCHEDULED_KEY = "telegram:flush_scheduled:{kind}"
+
+# Очередь чата хранит не больше стольких последних сообщений, например если бот удалён из чата
+MAX_BUFFERED = 1000
+
+_client = None
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.CELERY_BROKER_URL, decode_responses=True)
+    return _client
+
+
+def push(chat_kind, message) -> None:
+    key = _BUFFER_KEY.format(kind=chat_kind)
+    pipe = _get_client().pipeline(transaction=True)
+    pipe.rpush(key, message)
+    pipe.ltrim(key, -MAX_BUFFERED, -1)
+    pipe.execute()
+
+
+def push_front(chat_kind, messages) -> None:
+    """Возвращает неотправленные сообщения в начало очереди, сохраняя порядок"""
+    if messages:
+        key = _BUFFER_KEY.format(kind=chat_kind)
+        pipe = _get_client().pipeline(transaction=True)
+        pipe.lpush(key, *reversed(messages))
+        pipe.ltrim(key, -MAX_BUFFERED, -1)
+        pipe.execute()
+
+
+def pop_all(chat_kind) -> list:
+    key = _BUFFER_KEY.format(kind=chat_kind)
+    pipe = _get_client().pipeline(transaction=True)
+    pipe.lrange(key, 0, -1)
+    pipe.delete(key)
+    messages, _ = pipe.execute()
+    return messages
+
+
+def is_empty(chat_kind) -> bool:
+    return not _get_client().llen(_BUFFER_KEY.format(kind=chat_kind))
+
+
+def mark_scheduled(chat_kind, ttl) -> bool:
+    """
+    True, если отправка ещё не была запланирована и запланировать её должен вызывающий
+
+    Флаг держится, пока отправка не разберёт очередь, и работает как блокировка чата
+    """
+    return bool(_get_client().set(_SCHEDULED_KEY.format(kind=chat_kind), 1, nx=True, ex=max(int(ttl), 1)))
+
+
+def extend_scheduled(chat_kind, ttl) -> None:
+    _get_client().set(_SCHEDULED_KEY.format(kind=chat_kind), 1, ex=max(int(ttl), 1))
+
+
+def clear_scheduled(chat_kind) -> None:
+    _get_client().delete(_SCHEDULED_KEY.format(kind=chat_kind))
@@ -0,0 +1,88 @@
+import re
+
+# Лимит длины сообщения Telegram
+MESSAGE_LIMIT = 4096
+
+_TOKEN_RE = re.compile(r"(<[^>]+>|&#?\w+;)")
+_TAG_NAME_RE = re.compile(r"</?\s*([a-zA-Z0-9-]+)")
+# Разрез после перевода строки или пробела
+_BOUNDARY_RE = re.compile(r"(?<=\n)|(?<= )")
+
+
+def _pieces(token, limit):
+    """Куски токена, между которыми можно резать сообщение"""
+    if _TOKEN_RE.fullmatch(token):
+        return [token]
+    pieces = []
+    for piece in _BOUNDARY_RE.split(token):
+        # Слова длиннее лимита режем жёстко
+        pieces.extend(piece[i:i + limit // 2] for i in range(0, len(piece), limit // 2))
+    return pieces
+
+
+def split_html(text: str, limit: int = MESSAGE_LIMIT) -> list:
+    """
+    Делит HTML-сообщение на части не длиннее limit
+
+    Режет только между тегами, сущностями и по пробелам/переводам строк,
+    незакрытые теги закрываются в конце части и открываются заново в следующей
+    """
+    if len(text) <= limit:
+        return [text]
+
+    chunks = []
+    open_tags = []  # (имя, открывающий тег)
+    current = ""
+
+    def closing():
+        return "".join(f"</{name}>" for name, _ in reversed(open_tags))
+
+    for token in _TOKEN_RE.split(text):
+        for piece in _pieces(token, limit):
+            if not piece:
+                continue
+            reopened = "".join(tag for _, tag in open_tags)
+            if current != reopened and len(current) + len(piece) + len(closing()) > limit:
+                chunks.append(current + closing())
+                current = reopened
+            current += piece
+
+            if piece.startswith("<"):
+                match = _TAG_NAME_RE.match(piece)
+                if match is None:
+                    continue
+                name = match.group(1).lower()
+                if piece.startswith("</"):
+                    for i in range(len(open_tags) - 1, -1, -1):
+                        if open_tags[i][0] == name:
+                            del open_tags[i]
+                            break
+                elif not piece.endswith("/>"):
+                    open_tags.append((name, piece))
+
+    if current.strip():
+        chunks.append(current + closing())
+    return chunks
+
+
+def group_messages(messages, limit: int = MESSAGE_LIMIT) -> list:
+    """
+    Раскладывает сообщения по группам, каждая группа уходит одним запросом
+
+    :rtype: list
+    :return: Списки частей сообщений, склеенные через пустую строку они не длиннее limit
+    """
+    groups = []
+    current = []
+    length = 0
+    for message in messages:
+        for part in split_html(message, limit):
+            if current and length + 2 + len(part) > limit:
+                groups.append(current)
+                current = []
+                length = 0
+            length += len(part) + (2 if current else 0)
+            current.append(part)
+    if current:
+        groups.append(current)
+    return groups
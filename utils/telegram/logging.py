@@ -1,17 +1,158 @@
+import html
 import logging
-import traceback
+import os
+import threading
+import time
 
 from _project_ import constants
 
 
+class _Entry:
+    __slots__ = ("message", "window_start", "sent", "suppressed")
+
+    def __init__(self, message, window_start):
+        self.message = message
+        self.window_start = window_start
+        self.sent = False
+        self.suppressed = 0
+
+
 class TelegramHandler(logging.Handler):
+    """
+    Отправляет записи логов в телеграм, схлопывая повторы
+
+    Записи группируются по отпечатку (логгер, уровень, тип исключения, место вызова).
+    Первая запись группы уходит сразу, повторы в пределах окна только считаются
+    и отправляются одной сводкой "× N за последние 60 с" по окончании окна.
+    Отправкой занимается фоновый поток с ограничением скорости token bucket,
+    сам emit не блокируется и работает за O(1).
+    Группа удаляется только после отправки её первой записи, записи новых групп
+    сверх max_groups отбрасываются, а их число уходит отдельной сводкой
+
+    Пример настройки в LOGGING:
+        "telegram": {
+            "level": "ERROR",
+            "class": "utils.telegram.logging.TelegramHandler",
+            "window": 60,
+            "rate_per_minute": 20,
+        }
+    """
 
-    def __init__(self, *args, **kwargs):
+    tick = 1.0
+
+    def __init__(self, *args, window=60, rate_per_minute=20, burst=5, max_groups=1000, **kwargs):
         super().__init__(*args, **kwargs)
+        self.window = window
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_groups = max_groups
+
+        self._groups = {}
+        self._groups_lock = threading.Lock()
+        # Записи новых групп, отброшенные из-за лимита max_groups
+        self._dropped = 0
+        self._tokens = float(burst)
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @staticmethod
+    def _fingerprint(record: logging.LogRecord) -> tuple:
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        return record.name, record.levelno, exc_type, record.pathname, record.lineno
 
     def emit(self, record: logging.LogRecord) -> None:
-        message = traceback.format_exc()
+        try:
+            self._ensure_thread()
+            fingerprint = self._fingerprint(record)
+
+            with self._groups_lock:
+                entry = self._groups.get(fingerprint)
+                if entry is not None:
+                    entry.suppressed += 1
+                    return
+
+            # Форматируем только первую запись группы, вне блокировки
+            message = f"<pre>{html.escape(self.format(record))}</pre>"
+            with self._groups_lock:
+                entry = self._groups.get(fingerprint)
+                if entry is not None:
+                    entry.suppressed += 1
+                elif len(self._groups) < self.max_groups:
+                    self._groups[fingerprint] = _Entry(message, time.monotonic())
+                else:
+                    self._dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def _ensure_thread(self):
+        # После fork поток родителя в дочернем процессе не существует
+        if self._pid == os.getpid():
+            return
+        with self._groups_lock:
+            if self._pid == os.getpid():
+                return
+            self._groups = {}
+            self._dropped = 0
+            self._thread = threading.Thread(target=self._run, name="telegram-log-flusher", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        last = time.monotonic()
+        while not self._stop.wait(self.tick):
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - last) * self.rate)
+            last = now
+            self._flush(now)
+
+    def _take_token(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _flush(self, now, force=False):
+        with self._groups_lock:
+            entries = list(self._groups.items())
+
+        for fingerprint, entry in entries:
+            if not entry.sent and (force or self._take_token()):
+                self._send(entry.message)
+                entry.sent = True
+
+            # Группа живёт, пока не ушла её первая запись, иначе уникальная ошибка потерялась бы
+            if not entry.sent or (not force and now - entry.window_start < self.window):
+                continue
+
+            # Счётчик забирается вместе с группой под блокировкой, иначе повторы,
+            # пришедшие между чтением и удалением группы, потерялись бы
+            with self._groups_lock:
+                if entry.suppressed and not (force or self._take_token()):
+                    # Нет токенов, сводка уйдёт на следующем тике
+                    continue
+                self._groups.pop(fingerprint, None)
+                suppressed = entry.suppressed
+
+            if suppressed:
+                self._send(f"{entry.message}\n× {suppressed} за последние {self.window} с")
+
+        with self._groups_lock:
+            if not self._dropped or not (force or self._take_token()):
+                return
+            dropped, self._dropped = self._dropped, 0
+        self._send(f"Не отправлено записей логов: {dropped}, превышен лимит в {self.max_groups} групп")
+
+    def _send(self, message):
+        try:
+            from . import tasks
+            tasks.enqueue_message(message, constants.TelegramChatKind.LOGGING_HANDLER.value)
+        except Exception:
+            # Логировать здесь нельзя, ошибка снова попадёт в этот же обработчик
+            pass
 
-        from . import tasks
-        kind = constants.TelegramChatKind.LOGGING_HANDLER.value
-        tasks.send_to_telegram.delay(message, kind)
+    def close(self):
+        self._stop.set()
+        if self._pid == os.getpid():
+            self._flush(time.monotonic(), force=True)
+        super().close()
@@ -1,7 +1,7 @@
 from django.template.loader import render_to_string
 
 from _project_ import constants
-from .tasks import send_to_telegram
+from .tasks import enqueue_message
 
 
 def send_order_notification_example(order):
@@ -16,4 +16,4 @@ def send_order_notification_example(order):
         'telegram/order_notification_example.html',
         context={"order": order}
     )
-    send_to_telegram.delay(message, constants.TelegramChatKind.ORDER_NOTIFICATION_EXAMPLE.value)
+    enqueue_message(message, constants.TelegramChatKind.ORDER_NOTIFICATION_EXAMPLE.value)
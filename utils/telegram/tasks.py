@@ -1,26 +1,170 @@
+import logging
+
 import requests
 
-from _project_.celery import app
 from _project_ import constants
+from _project_.celery import app
+from core import cache
+from utils import http
+
+from . import api_urls, buffer
+from .chunking import group_messages, split_html
+
+CREDENTIALS_VERSION_NAME = "telegram_credentials"
+
+# Повторы при ошибках на стороне Telegram, 429 повторяется без ограничения
+SERVER_ERROR_RETRIES = 5
+# Срок флага отправки чата, продлевается перед каждым запросом, с запасом на таймауты и повторы соединения
+FLUSH_LEASE = 60
+# Сколько раз одна задача выбирает очередь, дальше отправку продолжает новая задача
+FLUSH_MAX_ROUNDS = 10
+
+_credentials = {}
+
+logger = logging.getLogger(__name__)
 
-from . import api_urls
 
+class BadRequest(Exception):
+    """Telegram отклонил текст сообщения, например из-за некорректного HTML"""
 
-@app.task()
-def send_to_telegram(message, chat_kind):
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Telegram ограничил отправку на {retry_after} с")
+        self.retry_after = retry_after
+
+
+def get_credentials(chat_kind) -> tuple:
+    """
+    Токен и chat_id для назначения чата
+
+    Кэшируется в процессе до смены версии, которую меняет сохранение TelegramBotCredentials
+    """
     from core import models
 
+    version = cache.get_version(CREDENTIALS_VERSION_NAME)
+    cached = _credentials.get(chat_kind)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
     tg_credentials = models.TelegramBotCredentials.objects.get(kind=chat_kind)
+    credentials = (tg_credentials.token, tg_credentials.chat_id)
+    _credentials[chat_kind] = (version, credentials)
+    return credentials
+
 
-    url = api_urls.get_send_message_url(tg_credentials.token)
-    chat_id = tg_credentials.chat_id
+def invalidate_credentials() -> None:
+    cache.bump_version_on_commit(CREDENTIALS_VERSION_NAME)
 
-    requests.post(
-        url,
+
+def _post(chat_kind, text) -> None:
+    token, chat_id = get_credentials(chat_kind)
+    response = http.request(
+        "telegram",
+        "POST",
+        api_urls.get_send_message_url(token),
         data={
             "chat_id": chat_id,
-            "text": message,
+            "text": text,
             "parse_mode": "HTML"
         },
-        timeout=constants.TELEGRAM_TIMEOUT
     )
+    if response.status_code == 429:
+        try:
+            retry_after = response.json()["parameters"]["retry_after"]
+        except (ValueError, KeyError, TypeError):
+            retry_after = 1
+        raise RateLimited(retry_after)
+    if response.status_code == 400:
+        raise BadRequest(response.text)
+    response.raise_for_status()
+
+
+def enqueue_message(message, chat_kind) -> None:
+    """
+    Ставит сообщение в очередь чата
+
+    Сообщения, накопившиеся за TELEGRAM_FLUSH_DELAY, уходят одной пачкой
+    """
+    buffer.push(chat_kind, message)
+    if buffer.mark_scheduled(chat_kind, ttl=FLUSH_LEASE):
+        flush_telegram_buffer.apply_async((chat_kind,), countdown=constants.TELEGRAM_FLUSH_DELAY)
+
+
+def _send_pending(chat_kind, pending) -> None:
+    """
+    Отправляет группы сообщений, удаляя из pending группы и их части по мере отправки
+
+    Группу с некорректным сообщением отправляет по одному, отбрасывается только само некорректное сообщение
+    """
+    while pending:
+        group = pending[0]
+        buffer.extend_scheduled(chat_kind, ttl=FLUSH_LEASE)
+        try:
+            _post(chat_kind, "\n\n".join(group))
+            group.clear()
+        except BadRequest as e:
+            if len(group) == 1:
+                logger.warning("Telegram отклонил сообщение: %s", e)
+                group.clear()
+
+        while group:
+            try:
+                _post(chat_kind, group[0])
+            except BadRequest as e:
+                logger.warning("Telegram отклонил сообщение: %s", e)
+            group.pop(0)
+        pending.pop(0)
+
+
+@app.task(bind=True, max_retries=None)
+def flush_telegram_buffer(self, chat_kind):
+    """
+    Отправляет накопленные сообщения чата минимальным числом запросов
+
+    Флаг отправки чата держится до конца разбора очереди, поэтому для чата работает
+    только одна отправка и порядок сообщений сохраняется
+    """
+    buffer.extend_scheduled(chat_kind, ttl=FLUSH_LEASE)
+
+    for _ in range(FLUSH_MAX_ROUNDS):
+        pending = group_messages(buffer.pop_all(chat_kind))
+        if not pending:
+            buffer.clear_scheduled(chat_kind)
+            # Сообщение могло прийти между выборкой и снятием флага, не запланировав отправку
+            if buffer.is_empty(chat_kind) or not buffer.mark_scheduled(chat_kind, ttl=FLUSH_LEASE):
+                return
+            continue
+
+        try:
+            _send_pending(chat_kind, pending)
+        except Exception as e:
+            # Неотправленные сообщения возвращаются в очередь при любой ошибке, её длина ограничена
+            buffer.push_front(chat_kind, [part for group in pending for part in group])
+
+            if isinstance(e, RateLimited):
+                countdown = e.retry_after
+            elif isinstance(e, requests.RequestException) and self.request.retries < SERVER_ERROR_RETRIES:
+                countdown = 2 ** self.request.retries
+            else:
+                # Флаг снимется по истечении срока, следующая попытка будет с новым сообщением
+                raise
+            buffer.extend_scheduled(chat_kind, ttl=countdown + FLUSH_LEASE)
+            raise self.retry(exc=e, countdown=countdown)
+
+    # Очередь всё ещё пополняется, продолжаем новой задачей, не отпуская флаг
+    flush_telegram_buffer.apply_async((chat_kind,))
+
+
+@app.task(bind=True, max_retries=None)
+def send_to_telegram(self, message, chat_kind):
+    """Отправляет сообщение сразу, без очереди, деля его на части по лимиту Telegram"""
+    parts = split_html(message)
+    for i, part in enumerate(parts):
+        try:
+            _post(chat_kind, part)
+        except RateLimited as e:
+            # Отправленные части не повторяются
+            raise self.retry(args=("\n".join(parts[i:]), chat_kind), countdown=e.retry_after)
+        except BadRequest as e:
+            logger.warning("Telegram отклонил сообщение: %s", e)